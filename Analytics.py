@@ -0,0 +1,590 @@
+import json  # For the checkpoint files of long all-pairs runs
+import os  # For the default number of worker processes and atomic checkpoint writes
+import time  # For reporting how long each computation took
+from collections import deque, namedtuple  # For the BFS queue and the result records
+from multiprocessing import Pool  # For running the all-pairs BFS across worker processes
+from colorama import Fore  # For format text output in the console with colors.
+from SharedGraph import SharedGraph, attach_worker, worker_rows  # For handing the graph to worker processes without copying it
+from Snapshot import GraphSnapshot  # For the array-encoded graph the algorithms run on
+
+try:
+    import numpy as np  # Optional: the HyperLogLog registers are NumPy arrays.
+except ImportError:
+    np = None
+
+
+# Result of a HyperANF run: neighborhood[h] estimates the number of ordered pairs
+# (u, v) with v at most h hops from u, counting every user paired with itself at h = 0
+HyperANFResult = namedtuple("HyperANFResult",
+                            ["neighborhood", "average_distance", "effective_diameter", "iterations", "seconds"])
+
+# Result of an exact diameter or radius computation: sweeps counts the BFS runs it needed
+EccentricityResult = namedtuple("EccentricityResult", ["value", "sweeps", "seconds"])
+
+# Result of an all-pairs BFS run: histogram[h] counts the ordered (source, target) pairs
+# h hops apart (histogram[0] counts the sources themselves), unreachable the pairs with no path
+HopHistogramResult = namedtuple("HopHistogramResult", ["histogram", "unreachable", "sources", "seconds", "complete"])
+
+# Result of a direction-optimizing BFS: distances[v] is the hop count from the source to vertex v of
+# the graph's snapshot (-1 = unreachable), directions the step type used for each level
+BFSResult = namedtuple("BFSResult", ["distances", "directions", "seconds"])
+
+
+def _hash64(values, seed):
+    """SplitMix64 hash of an array of vertex numbers (uint64 arithmetic wraps around)."""
+    z = values.astype(np.uint64) + np.uint64((0x9E3779B97F4A7C15 * (seed + 1)) & 0xFFFFFFFFFFFFFFFF)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _initial_registers(count, precision, seed):
+    """HyperLogLog counters that each hold only their own vertex."""
+    registers = np.zeros((count, 1 << precision), dtype=np.uint8)
+    hashes = _hash64(np.arange(count), seed)
+    buckets = (hashes & np.uint64((1 << precision) - 1)).astype(np.int64)
+    rest = hashes >> np.uint64(precision)
+    # Register value = position of the lowest set bit of the remaining hash bits (1-based)
+    lowest = rest & (~rest + np.uint64(1))
+    ranks = np.where(rest == 0, 64 - precision + 1, np.log2(np.maximum(lowest, 1).astype(np.float64)) + 1)
+    registers[np.arange(count), buckets] = ranks.astype(np.uint8)
+    return registers
+
+
+def _estimate(registers):
+    """HyperLogLog cardinality estimate of every counter (one row each), with the small-range correction."""
+    m = registers.shape[1]
+    alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+    raw = alpha * m * m / np.exp2(-registers.astype(np.float64)).sum(axis=1)
+    zeros = np.count_nonzero(registers == 0, axis=1)
+    # Linear counting is more accurate while many registers are still empty
+    small = (raw <= 2.5 * m) & (zeros > 0)
+    linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where(small, linear, raw)
+
+
+def _union_step(registers, offsets, indices, block_bytes):
+    """Return each counter united with the counters of its neighbours (register-wise maximum)."""
+    count, m = registers.shape
+    result = registers.copy()
+    degrees = np.diff(offsets)
+    # Gather neighbour registers a block of vertices at a time so memory stays bounded
+    block_edges = max(block_bytes // m, 1)
+    first = 0
+    while first < count:
+        last = int(np.searchsorted(offsets, offsets[first] + block_edges, side="right")) - 1
+        last = min(max(last, first + 1), count)
+        rows = np.flatnonzero(degrees[first:last]) + first  # reduceat needs non-empty segments
+        if len(rows):
+            gathered = registers[indices[offsets[first]:offsets[last]]]
+            merged = np.maximum.reduceat(gathered, offsets[rows] - offsets[first], axis=0)
+            result[rows] = np.maximum(result[rows], merged)
+        first = last
+    return result
+
+
+def _effective_diameter(neighborhood, percentile):
+    """Smallest (interpolated) h such that neighborhood[h] reaches the given share of all reachable pairs."""
+    target = percentile * neighborhood[-1]
+    for h, pairs in enumerate(neighborhood):
+        if pairs >= target:
+            if h == 0:
+                return 0.0
+            previous = neighborhood[h - 1]
+            return h - 1 + (target - previous) / (pairs - previous)
+    return float(len(neighborhood) - 1)
+
+
+def hyperanf(graph, precision=6, max_iter=None, percentile=0.9, seed=0, block_bytes=1 << 24):
+    """
+    Estimate the neighbourhood function, average distance and effective diameter with HyperANF.
+
+    Every user keeps a HyperLogLog counter of the users within h hops. One
+    iteration unites each counter with those of its friends, so h iterations
+    of linear work in the number of connections give the ball sizes for
+    every radius up to h, without running a BFS from anyone.
+
+    Parameters:
+    graph (AdjacencyMatrix or GraphSnapshot): The friendship graph.
+    precision (int): log2 of the registers per counter (4 .. 16); the relative
+        error of every ball size is about 1.04 / sqrt(2 ** precision).
+    max_iter (int): Stop after this many hops (None: until no counter changes).
+    percentile (float): Share of reachable pairs the effective diameter covers.
+    seed (int): Seed of the hash function, for independent repetitions.
+    block_bytes (int): Upper bound on the scratch memory of one union step.
+
+    Returns a HyperANFResult(neighborhood, average_distance, effective_diameter, iterations, seconds).
+
+    """
+    if not 4 <= precision <= 16:
+        raise ValueError("Precision must be between 4 and 16.")
+    start = time.perf_counter()
+    snapshot = GraphSnapshot.of(graph)
+    offsets, indices = snapshot.arrays()
+    count = len(snapshot)
+    if count == 0:
+        return HyperANFResult([], 0.0, 0.0, 0, time.perf_counter() - start)
+
+    registers = _initial_registers(count, precision, seed)
+    neighborhood = [float(_estimate(registers).sum())]
+    iterations = 0
+    while max_iter is None or iterations < max_iter:
+        updated = _union_step(registers, offsets, indices, block_bytes)
+        if np.array_equal(updated, registers):
+            break  # Every ball has stopped growing
+        registers = updated
+        iterations += 1
+        # Estimates can wobble slightly; ball sizes never shrink
+        neighborhood.append(max(float(_estimate(registers).sum()), neighborhood[-1]))
+
+    # Pairs at exactly h hops are the growth of the neighbourhood function at h
+    reachable = neighborhood[-1] - neighborhood[0]
+    total = sum(h * (neighborhood[h] - neighborhood[h - 1]) for h in range(1, len(neighborhood)))
+    average_distance = total / reachable if reachable > 0 else 0.0
+    effective_diameter = _effective_diameter(neighborhood, percentile)
+    return HyperANFResult(neighborhood, average_distance, effective_diameter, iterations,
+                          time.perf_counter() - start)
+
+
+def _bfs_distances(adjacency, source):
+    """Return a list of hop distances from source to every vertex (-1 = unreachable)."""
+    distances = [-1] * len(adjacency)
+    distances[source] = 0
+    queue = deque([source])
+    while queue:
+        vertex = queue.popleft()
+        next_distance = distances[vertex] + 1
+        for neighbor in adjacency[vertex]:
+            if distances[neighbor] < 0:
+                distances[neighbor] = next_distance
+                queue.append(neighbor)
+    return distances
+
+
+def _largest_component(adjacency):
+    """Return the vertices of the largest connected component."""
+    seen = [False] * len(adjacency)
+    best = []
+    for root in range(len(adjacency)):
+        if seen[root]:
+            continue
+        seen[root] = True
+        component = [root]
+        for vertex in component:  # The list grows while it is scanned, like a BFS queue
+            for neighbor in adjacency[vertex]:
+                if not seen[neighbor]:
+                    seen[neighbor] = True
+                    component.append(neighbor)
+        if len(component) > len(best):
+            best = component
+    return best
+
+
+def _ifub_diameter(adjacency):
+    """
+    Exact diameter of the largest component with iFUB (iterative fringe upper bound).
+
+    A 4-sweep finds a central user near the middle of a long shortest path,
+    and either it or the best-connected user becomes the root r. Users are then examined level by level from the farthest from r: any two
+    users closer to r than level i are at most 2 (i - 1) hops apart, so once
+    the longest distance found exceeds that, nobody nearer can beat it. Every
+    BFS also bounds every eccentricity from above (ecc(v) <= ecc(s) + d(s, v)),
+    and fringe users whose bound cannot beat the diameter found are skipped.
+    Returns (diameter, number of BFS runs).
+
+    """
+    component = _largest_component(adjacency)
+    if len(component) <= 1:
+        return 0, 0
+    upper = [float('inf')] * len(adjacency)
+    lower_bound = 0  # Longest shortest path found so far
+    sweeps = 0
+
+    def sweep(source):
+        """BFS from source, tightening the bounds; returns (distances, eccentricity)."""
+        nonlocal lower_bound, sweeps
+        distances = _bfs_distances(adjacency, source)
+        sweeps += 1
+        eccentricity = max(distances)
+        lower_bound = max(lower_bound, eccentricity)
+        for vertex in component:
+            if eccentricity + distances[vertex] < upper[vertex]:
+                upper[vertex] = eccentricity + distances[vertex]
+        return distances, eccentricity
+
+    def middle(distances):
+        """Sweep twice from the farthest user and return a user halfway along the longest path found."""
+        end1 = max(component, key=lambda vertex: distances[vertex])
+        from_end1, length = sweep(end1)
+        end2 = max(component, key=lambda vertex: from_end1[vertex])
+        from_end2, _ = sweep(end2)
+        half = length // 2
+        return next(vertex for vertex in component
+                    if from_end1[vertex] == half and from_end2[vertex] == length - half)
+
+    def fringes_from(distances, eccentricity):
+        """Group the component by distance from a root; the fewer in the top level, the fewer BFS runs."""
+        fringes = {}
+        for vertex in component:
+            fringes.setdefault(distances[vertex], []).append(vertex)
+        return eccentricity, len(fringes[eccentricity]), fringes
+
+    # 4-sweep: start from the best-connected user, then from the middle of the first long path.
+    # The root is whichever of the hub and the final middle user has the smaller top level.
+    from_hub, hub_eccentricity = sweep(max(component, key=lambda vertex: len(adjacency[vertex])))
+    middle_root = middle(sweep(middle(from_hub))[0])
+    level, _, fringes = min(fringes_from(from_hub, hub_eccentricity),
+                            fringes_from(*sweep(middle_root)), key=lambda option: option[:2])
+
+    upper_bound = 2 * level
+    while upper_bound > lower_bound:
+        for vertex in fringes[level]:
+            if upper[vertex] > lower_bound:  # Only users that might be farther out need a BFS
+                sweep(vertex)
+                if lower_bound == upper_bound:
+                    return lower_bound, sweeps  # Nobody can be farther apart than this level allows
+        # Every pair with a user at this level or beyond has been measured
+        upper_bound = 2 * (level - 1)
+        level -= 1
+    return lower_bound, sweeps
+
+
+def _bounding_radius(adjacency):
+    """
+    Exact radius of the largest component with Takes-Kosters eccentricity bounding.
+
+    Every BFS from a vertex v with eccentricity e bounds each other vertex w:
+    max(d(v, w), e - d(v, w)) <= ecc(w) <= e + d(v, w). Vertices whose bounds
+    show they cannot be more central than the best found (nor help bound the
+    others) stop being candidates, and the next BFS starts alternately from
+    the candidate with the smallest lower bound and the one with the largest
+    upper bound. Returns (radius, number of BFS runs).
+
+    """
+    candidates = _largest_component(adjacency)
+    if len(candidates) <= 1:
+        return 0, 0
+    lower = [0] * len(adjacency)
+    upper = [float('inf')] * len(adjacency)
+    degree = [len(neighbors) for neighbors in adjacency]
+    min_upper = float('inf')  # Smallest eccentricity found so far
+    current = max(candidates, key=lambda vertex: degree[vertex])  # Hubs are usually central
+    high = False
+    sweeps = 0
+    while candidates:
+        distances = _bfs_distances(adjacency, current)
+        sweeps += 1
+        eccentricity = max(distances)
+        for vertex in candidates:
+            distance = distances[vertex]
+            lower[vertex] = max(lower[vertex], distance, eccentricity - distance)
+            upper[vertex] = min(upper[vertex], eccentricity + distance)
+        min_upper = min(min_upper, min(upper[vertex] for vertex in candidates))
+        min_lower = min(lower[vertex] for vertex in candidates)
+        candidates = [vertex for vertex in candidates
+                      if lower[vertex] != upper[vertex]
+                      and not (lower[vertex] >= min_upper and upper[vertex] + 1 <= 2 * min_lower)]
+        if not candidates:
+            break
+        if high:
+            current = max(candidates, key=lambda vertex: (upper[vertex], degree[vertex]))
+        else:
+            current = min(candidates, key=lambda vertex: (lower[vertex], -degree[vertex]))
+        high = not high
+    return min_upper, sweeps
+
+
+def diameter(graph):
+    """
+    Return the exact diameter (most hops between two connected users) of the largest component.
+
+    Uses iFUB with eccentricity upper bounds. iFUB stops early only when the
+    diameter is well below twice the radius; on random and small-world graphs
+    the two are close, whole fringe levels must be swept, and the run can take
+    hundreds to thousands of BFS runs (about one per user at worst, like the
+    all-pairs method). The EccentricityResult reports how many were needed.
+
+    """
+    start = time.perf_counter()
+    snapshot = GraphSnapshot.of(graph)
+    value, sweeps = _ifub_diameter(snapshot.adjacency())
+    return EccentricityResult(value, sweeps, time.perf_counter() - start)
+
+
+def radius(graph):
+    """Return the exact radius (smallest eccentricity) of the largest component, using Takes-Kosters bounding."""
+    start = time.perf_counter()
+    snapshot = GraphSnapshot.of(graph)
+    value, sweeps = _bounding_radius(snapshot.adjacency())
+    return EccentricityResult(value, sweeps, time.perf_counter() - start)
+
+
+def eccentricity(graph, user):
+    """Return the most hops from user to anyone they are connected to (None if the user is unknown)."""
+    snapshot = GraphSnapshot.of(graph)
+    if user not in snapshot.position:
+        print(f"{Fore.RED}User {user} not found.")
+        return None
+    return max(_bfs_distances(snapshot.adjacency(), snapshot.position[user]))
+
+
+def _histogram_range(adjacency, first, last):
+    """BFS from every vertex in first .. last - 1; returns (hop histogram, unreachable pairs)."""
+    count = len(adjacency)
+    histogram = []
+    unreachable = 0
+    distances = [-1] * count
+    for source in range(first, last):
+        distances[source] = 0
+        reached = [source]
+        for vertex in reached:  # The list grows while it is scanned, like a BFS queue
+            next_distance = distances[vertex] + 1
+            for neighbor in adjacency[vertex]:
+                if distances[neighbor] < 0:
+                    distances[neighbor] = next_distance
+                    reached.append(neighbor)
+        for vertex in reached:
+            distance = distances[vertex]
+            if distance >= len(histogram):
+                histogram.extend([0] * (distance + 1 - len(histogram)))
+            histogram[distance] += 1
+            distances[vertex] = -1  # Reset for the next source
+        unreachable += count - len(reached)
+    return histogram, unreachable
+
+
+def _add_histogram(total, histogram):
+    """Add histogram into total in place."""
+    if len(histogram) > len(total):
+        total.extend([0] * (len(histogram) - len(total)))
+    for distance, pairs in enumerate(histogram):
+        total[distance] += pairs
+
+
+def _histogram_chunk(bounds):
+    """Run the BFS for one chunk of sources inside a worker process."""
+    first, last = bounds
+    return first, last, *_histogram_range(worker_rows(), first, last)
+
+
+def _write_checkpoint(path, state):
+    """Write the checkpoint atomically, so an interrupted write never leaves a corrupt file."""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(state, file)
+    os.replace(temporary, path)
+
+
+def hop_histogram(graph, first=0, last=None, processes=None, chunk_size=256,
+                  checkpoint=None, checkpoint_seconds=60.0):
+    """
+    Count the exact degrees of separation between all pairs of users by BFS from every user.
+
+    Sources first .. last - 1 (vertices of the graph's snapshot, i.e. live users
+    in index order) are split into chunks run by a pool of worker processes,
+    which read the graph from a SharedGraph instead of a copy. Chunk
+    histograms are added up as they arrive.
+
+    With a checkpoint path, progress is saved there every checkpoint_seconds
+    and at the end, and a later call with the same path, graph and range
+    skips the chunks already done, so a long run can be resumed.
+
+    Parameters:
+    graph (AdjacencyMatrix or GraphSnapshot): The friendship graph.
+    first, last (int): Range of BFS sources (all users by default).
+    processes (int): Worker processes (os.cpu_count() by default; 1 runs in this process).
+    chunk_size (int): Sources per task.
+    checkpoint (str): Path of the JSON checkpoint file, or None.
+    checkpoint_seconds (float): Minimum time between checkpoint writes.
+
+    Returns a HopHistogramResult(histogram, unreachable, sources, seconds, complete).
+
+    """
+    start = time.perf_counter()
+    snapshot = GraphSnapshot.of(graph)
+    last = len(snapshot) if last is None else min(last, len(snapshot))
+    chunks = [(begin, min(begin + chunk_size, last)) for begin in range(first, last, chunk_size)]
+
+    # A checkpoint only applies to the same graph, range and chunking
+    identity = {"version": snapshot.version, "users": len(snapshot), "connections": snapshot.num_edges,
+                "first": first, "last": last, "chunk_size": chunk_size}
+    state = dict(identity, done=[], histogram=[], unreachable=0)
+    if checkpoint is not None and os.path.exists(checkpoint):
+        with open(checkpoint, encoding="utf-8") as file:
+            saved = json.load(file)
+        if all(saved.get(key) == value for key, value in identity.items()):
+            state = saved
+    done = set(state["done"])
+    pending = [chunk for chunk in chunks if chunk[0] not in done]
+
+    last_write = time.perf_counter()
+
+    def add(begin, histogram, unreachable):
+        """Fold one chunk into the totals and checkpoint now and then."""
+        nonlocal last_write
+        _add_histogram(state["histogram"], histogram)
+        state["unreachable"] += unreachable
+        state["done"].append(begin)
+        if checkpoint is not None and time.perf_counter() - last_write >= checkpoint_seconds:
+            _write_checkpoint(checkpoint, state)
+            last_write = time.perf_counter()
+
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(pending) <= 1:
+        # Plain lists are faster to walk in this process; the pool reads the shared arrays instead
+        adjacency = snapshot.adjacency()
+        for begin, end in pending:
+            add(begin, *_histogram_range(adjacency, begin, end))
+    else:
+        with SharedGraph.publish(snapshot) as shared, \
+                Pool(processes, initializer=attach_worker, initargs=(shared.name,)) as pool:
+            for begin, _, histogram, unreachable in pool.imap_unordered(_histogram_chunk, pending):
+                add(begin, histogram, unreachable)
+    if checkpoint is not None:
+        _write_checkpoint(checkpoint, state)
+
+    done = set(state["done"])  # Now including the chunks finished by this call
+    sources = sum(end - begin for begin, end in chunks if begin in done)
+    return HopHistogramResult(state["histogram"], state["unreachable"], sources,
+                              time.perf_counter() - start, sources == last - first)
+
+
+def _edge_ranges(starts, ends):
+    """Return every position in starts[i] .. ends[i] - 1 for all i, concatenated."""
+    lengths = ends - starts
+    # Shift a global arange so that each run begins at its own start
+    shifts = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+    return shifts + np.arange(int(lengths.sum()), dtype=np.int64)
+
+
+def _direction_optimizing_levels(offsets, indices, source, alpha, beta, probes=4):
+    """
+    Level-synchronous BFS over CSR arrays, switching between top-down and bottom-up steps.
+
+    Top-down steps gather the neighbours of the frontier; bottom-up steps
+    check every unvisited vertex for a neighbour in the frontier. Following
+    Beamer, the search goes bottom-up once the frontier's edges outnumber the
+    unvisited vertices' edges / alpha, and back top-down once the frontier
+    holds fewer than count / beta vertices (alpha = 0 never goes bottom-up). Bottom-up steps test the first
+    probes edges of every unvisited vertex one round at a time, so most
+    vertices stop at their first edges into the frontier.
+
+    """
+    count = len(offsets) - 1
+    degrees = np.diff(offsets)
+    distances = np.full(count, -1, dtype=np.int64)
+    distances[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    unvisited_edges = int(degrees.sum()) - int(degrees[source])
+    directions = []
+    bottom_up = False
+    level = 0
+    while len(frontier):
+        frontier_edges = int(degrees[frontier].sum())
+        if not bottom_up and frontier_edges * alpha > unvisited_edges:
+            bottom_up = True
+        elif bottom_up and len(frontier) * beta < count:
+            bottom_up = False
+        if bottom_up:
+            in_frontier = distances == level
+            # An unvisited vertex joins the next level if any of its edges leads into the frontier.
+            # Probe the edges one at a time for every vertex together, dropping vertices once found
+            # (the vectorized form of the early exit), then scan whatever is left in one go.
+            waiting = np.flatnonzero((distances < 0) & (degrees > 0))
+            position = offsets[waiting]
+            found = []
+            for _ in range(probes):
+                hit = in_frontier[indices[position]]
+                found.append(waiting[hit])
+                position += 1
+                left = ~hit & (position < offsets[waiting + 1])
+                waiting, position = waiting[left], position[left]
+                if not len(waiting):
+                    break
+            if len(waiting):
+                ends = offsets[waiting + 1]
+                hits = in_frontier[indices[_edge_ranges(position, ends)]]
+                found.append(np.unique(np.repeat(waiting, ends - position)[hits]))
+            next_frontier = np.sort(np.concatenate(found))
+        else:
+            neighbors = indices[_edge_ranges(offsets[frontier], offsets[frontier + 1])]
+            next_frontier = np.unique(neighbors[distances[neighbors] < 0])
+        directions.append("bottom-up" if bottom_up else "top-down")
+        level += 1
+        distances[next_frontier] = level
+        unvisited_edges -= int(degrees[next_frontier].sum())
+        frontier = next_frontier
+    return distances, directions[:-1]  # The last step only confirmed that nothing was left
+
+
+def hop_distances(graph, user, alpha=15, beta=18):
+    """
+    Return the hops from user to every vertex of graph's snapshot with a direction-optimizing BFS.
+
+    Each level is expanded with vectorized NumPy gathers over the snapshot's
+    CSR arrays, top-down or bottom-up depending on the size of the frontier.
+
+    Returns a BFSResult(distances, directions, seconds), or None if the user is unknown.
+
+    """
+    start = time.perf_counter()
+    snapshot = GraphSnapshot.of(graph)
+    if user not in snapshot.position:
+        print(f"{Fore.RED}User {user} not found.")
+        return None
+    offsets, indices = snapshot.arrays()
+    distances, directions = _direction_optimizing_levels(offsets, indices, snapshot.position[user], alpha, beta)
+    return BFSResult(distances, directions, time.perf_counter() - start)
+
+
+def bfs_order(graph, user, alpha=15, beta=18):
+    """
+    Return the (user, depth, parent) tuples of a breadth-first walk from user, vectorized.
+
+    The result is exactly what AdjacencyMatrix.iter_bfs yields: within a
+    level, users are ordered by when their first-queued parent was visited
+    and then by index, which is the order a FIFO queue visits them in.
+    Returns an empty list if the user is unknown.
+
+    """
+    snapshot = GraphSnapshot.of(graph)
+    result = hop_distances(snapshot, user, alpha, beta)
+    if result is None:
+        return []
+    distances = result.distances
+    offsets, indices = snapshot.arrays()
+    count = len(snapshot)
+    sources = np.repeat(np.arange(count, dtype=np.int64), np.diff(offsets))
+    # Tree-edge candidates: child one level below parent; grouped by the child's level
+    tree = (distances[sources] > 0) & (distances[indices] == distances[sources] - 1)
+    children, parents = sources[tree], indices[tree]
+    by_level = np.argsort(distances[children], kind="stable")
+    children, parents = children[by_level], parents[by_level]
+    level_starts = np.searchsorted(distances[children], np.arange(1, int(distances.max()) + 2))
+
+    source = snapshot.position[user]
+    rank = np.zeros(count, dtype=np.int64)  # Queue position of each visited vertex
+    order = [np.array([source])]
+    first_parent = np.full(count, -1, dtype=np.int64)
+    placed = 1
+    for level in range(len(level_starts) - 1):
+        child = children[level_starts[level]:level_starts[level + 1]]
+        if not len(child):
+            break
+        parent = parents[level_starts[level]:level_starts[level + 1]]
+        # Keep each child's earliest-queued parent
+        earliest = np.lexsort((rank[parent], child))
+        child, parent = child[earliest], parent[earliest]
+        keep = np.append(True, child[1:] != child[:-1])
+        child, parent = child[keep], parent[keep]
+        # Children come off the queue in their parents' order, then by index
+        queued = np.lexsort((child, rank[parent]))
+        child, parent = child[queued], parent[queued]
+        rank[child] = np.arange(placed, placed + len(child))
+        first_parent[child] = parent
+        placed += len(child)
+        order.append(child)
+
+    names = snapshot.names
+    return [(names[vertex], int(distances[vertex]), names[first_parent[vertex]] if first_parent[vertex] >= 0 else None)
+            for vertex in np.concatenate(order).tolist()]
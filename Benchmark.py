@@ -0,0 +1,419 @@
+import io  # For discarding the output printed by the traversal methods.
+import multiprocessing  # For timing worker pool startup under each start method.
+import os  # For the number of CPUs used by the worker pools.
+import random  # For generating reproducible random networks.
+import time  # For timing each operation.
+from contextlib import redirect_stdout  # For silencing prints while timing.
+from colorama import Fore, init  # For format text output in the console with colors.
+import networkx as nx  # For checking results against the reference implementations.
+from Graph import AdjacencyMatrix
+from DistanceIndex import LandmarkIndex, PrunedLandmarkLabeling, bfs_distances
+from Recommender import FriendRecommender
+from Centrality import pagerank, MonteCarloPageRank, betweenness_centrality
+from Community import louvain, label_propagation
+from Analytics import hyperanf, diameter, radius, hop_histogram, hop_distances
+from SharedGraph import SharedGraph, attach_worker, worker_rows
+from Storage import np  # None when NumPy is not installed
+
+
+# Initialize colorama
+init(autoreset=True)
+
+
+def timed(function, *args):
+    """Run function(*args) and return (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def random_community(num_users, probability, seed=42):
+    """Return the user names and the friendships of a dense random community."""
+    rng = random.Random(seed)
+    names = [f"user{i}" for i in range(num_users)]
+    edges = [(names[i], names[j])
+             for i in range(num_users)
+             for j in range(i + 1, num_users)
+             if rng.random() < probability]
+    return names, edges
+
+
+def build_graph(backend, names, edges):
+    """Create an AdjacencyMatrix with the given backend, users and friendships."""
+    graph = AdjacencyMatrix(backend=backend)
+    for name in names:
+        graph.adduser(name)
+    for user1, user2 in edges:
+        graph.addconnection(user1, user2)
+    return graph
+
+
+def available_backends():
+    """Return the storage backends that can run in this environment."""
+    backends = ["dense", "csr", "bitset"]
+    if np is not None:
+        backends.append("numpy")
+    return backends
+
+
+def benchmark_backends(backends=None, num_users=600, probability=0.3, probes=20000):
+    """Compare the storage backends on a dense, tightly-knit community."""
+    backends = backends or available_backends()
+    names, edges = random_community(num_users, probability)
+    rng = random.Random(7)
+    pairs = [tuple(rng.sample(names, 2)) for _ in range(probes)]
+
+    print(Fore.GREEN + f"\nBackends on {num_users} users, {len(edges)} connections, {probes} probes:")
+    print(f"{'backend':<8} {'build':>9} {'edge test':>10} {'mutual':>9} {'bfs':>9}")
+    for backend in backends:
+        graph, build_time = timed(build_graph, backend, names, edges)
+        _, edge_time = timed(lambda: [graph.has_connection(a, b) for a, b in pairs])
+        _, mutual_time = timed(lambda: [graph.mutual_friend_count(a, b) for a, b in pairs])
+        with redirect_stdout(io.StringIO()):
+            _, bfs_time = timed(graph.bfs, names[0])
+        print(f"{backend:<8} {build_time:>8.3f}s {edge_time:>9.3f}s {mutual_time:>8.3f}s {bfs_time:>8.3f}s")
+
+
+def benchmark_growth(backends=None, num_users=3000):
+    """Time adding users one by one, then recounting every degree from the storage."""
+    backends = backends or available_backends()
+    names = [f"user{i}" for i in range(num_users)]
+
+    print(Fore.GREEN + f"\nAdding {num_users} users, then recounting the degrees from the storage:")
+    print(f"{'backend':<8} {'adduser':>9} {'recount':>9}")
+    for backend in backends:
+        graph = AdjacencyMatrix(backend=backend)
+        _, add_time = timed(lambda: [graph.adduser(name) for name in names])
+        # The statistics read live counters in O(1); verify_counters recounts them through the backend
+        _, recount_time = timed(graph.verify_counters)
+        print(f"{backend:<8} {add_time:>8.3f}s {recount_time:>8.3f}s")
+
+
+def random_network(num_users, num_connections, seed=42):
+    """Return the user names and the friendships of a sparse random network."""
+    rng = random.Random(seed)
+    names = [f"user{i}" for i in range(num_users)]
+    edges = set()
+    while len(edges) < num_connections:
+        i, j = rng.randrange(num_users), rng.randrange(num_users)
+        if i != j:
+            edges.add((names[min(i, j)], names[max(i, j)]))
+    return names, sorted(edges)
+
+
+def benchmark_removal(backend="csr", num_users=100000, num_connections=500000, num_removed=10000):
+    """Time purging a batch of accounts from a large sparse network."""
+    names, edges = random_network(num_users, num_connections)
+    graph, build_time = timed(build_graph, backend, names, edges)
+    removed = random.Random(3).sample(names, num_removed)
+
+    print(Fore.GREEN + f"\nRemoving {num_removed} of {num_users} users ({num_connections} connections, {backend}):")
+    _, remove_time = timed(lambda: [graph.removeuser(name) for name in removed])
+    _, compact_time = timed(graph.compact)
+    print(f"build {build_time:.3f}s, removeuser {remove_time:.3f}s, compact {compact_time:.3f}s")
+
+
+def benchmark_clustering(backend="csr", num_users=100000, num_connections=1000000):
+    """Time the native clustering engine against NetworkX on a large sparse network."""
+    names, edges = random_network(num_users, num_connections)
+    graph = build_graph(backend, names, edges)
+
+    print(Fore.GREEN + f"\nClustering on {num_users} users, {num_connections} connections ({backend}):")
+    average, native_time = timed(graph.average_clustering)
+    transitivity, transitivity_time = timed(graph.transitivity)
+    print(f"native   average {average:.6f} in {native_time:.3f}s, transitivity {transitivity:.6f} in {transitivity_time:.3f}s")
+
+    G = nx.Graph()
+    G.add_nodes_from(names)
+    G.add_edges_from(edges)
+    expected, networkx_time = timed(nx.average_clustering, G)
+    print(f"networkx average {expected:.6f} in {networkx_time:.3f}s")
+
+
+def benchmark_cores(backend="csr", num_users=100000, num_connections=1000000):
+    """Time the bucket-queue core decomposition against NetworkX on a large sparse network."""
+    names, edges = random_network(num_users, num_connections)
+    graph = build_graph(backend, names, edges)
+
+    print(Fore.GREEN + f"\nCore numbers on {num_users} users, {num_connections} connections ({backend}):")
+    cores, native_time = timed(graph.core_numbers)
+    G = nx.Graph()
+    G.add_nodes_from(names)
+    G.add_edges_from(edges)
+    _, networkx_time = timed(nx.core_number, G)
+    print(f"native {native_time:.3f}s (largest core {max(cores.values())}), networkx {networkx_time:.3f}s")
+
+
+def small_world(num_users, friends_per_user=10, rewire=0.1, seed=42):
+    """Return the user names and the friendships of a Watts-Strogatz small-world network."""
+    G = nx.watts_strogatz_graph(num_users, friends_per_user, rewire, seed=seed)
+    names = [f"user{i}" for i in range(num_users)]
+    return names, [(names[i], names[j]) for i, j in G.edges]
+
+
+def benchmark_shortest_path(backend="csr", num_users=50000, queries=20):
+    """Compare Dijkstra with the bidirectional BFS on a small-world network."""
+    names, edges = small_world(num_users)
+    graph = build_graph(backend, names, edges)
+    rng = random.Random(11)
+    pairs = [tuple(rng.sample(names, 2)) for _ in range(queries)]
+
+    print(Fore.GREEN + f"\nDegrees of separation, {queries} queries on a {num_users}-user small world ({backend}):")
+    with redirect_stdout(io.StringIO()):
+        _, dijkstra_time = timed(lambda: [graph.dijkstra(a, b) for a, b in pairs])
+    results, bidirectional_time = timed(lambda: [graph.shortest_path(a, b) for a, b in pairs])
+    average_hops = sum(hops for _, hops in results) / queries
+    print(f"dijkstra {dijkstra_time / queries * 1000:.2f}ms/query, "
+          f"bidirectional BFS {bidirectional_time / queries * 1000:.2f}ms/query, average {average_hops:.1f} hops")
+
+
+def benchmark_landmarks(backend="csr", num_users=50000, num_landmarks=16, queries=1000):
+    """Report build time, memory and query latency of the landmark distance oracle."""
+    names, edges = small_world(num_users)
+    graph = build_graph(backend, names, edges)
+    rng = random.Random(13)
+    pairs = [tuple(rng.sample(names, 2)) for _ in range(queries)]
+
+    index = LandmarkIndex(graph, num_landmarks=num_landmarks)
+    print(Fore.GREEN + f"\nLandmark index, {num_landmarks} landmarks on a {num_users}-user small world ({backend}):")
+    print(f"build {index.build_seconds:.3f}s, memory {index.memory_bytes() / 1024:.1f} KiB")
+    bounds, bounds_time = timed(lambda: [index.bounds(a, b) for a, b in pairs])
+    _, astar_time = timed(lambda: [index.shortest_path(a, b) for a, b in pairs[:100]])
+    _, bfs_time = timed(lambda: [graph.shortest_path(a, b) for a, b in pairs[:100]])
+    exact = sum(1 for lower, upper in bounds if lower == upper)
+    print(f"bounds {bounds_time / queries * 1e6:.1f}us/query ({exact}/{queries} exact), "
+          f"A* {astar_time / 100 * 1000:.2f}ms/query, bidirectional BFS {bfs_time / 100 * 1000:.2f}ms/query")
+
+
+def scale_free(num_users, friends_per_user=5, seed=42):
+    """Return the user names and the friendships of a Barabasi-Albert network with a few large hubs."""
+    G = nx.barabasi_albert_graph(num_users, friends_per_user, seed=seed)
+    names = [f"user{i}" for i in range(num_users)]
+    return names, [(names[i], names[j]) for i, j in G.edges]
+
+
+def benchmark_labeling(backend="csr", num_users=10000, queries=10000):
+    """Report build time, label size and query latency of pruned landmark labeling."""
+    names, edges = scale_free(num_users)
+    graph = build_graph(backend, names, edges)
+    rng = random.Random(17)
+    pairs = [tuple(rng.sample(names, 2)) for _ in range(queries)]
+
+    labeling = PrunedLandmarkLabeling(graph)
+    print(Fore.GREEN + f"\nPruned landmark labeling on a {num_users}-user scale-free network ({backend}):")
+    print(f"build {labeling.build_seconds:.3f}s, {labeling.average_label_size():.1f} hubs per label")
+    _, query_time = timed(lambda: [labeling.distance(a, b) for a, b in pairs])
+    print(f"distance {query_time / queries * 1e6:.1f}us/query")
+
+
+def benchmark_recommendations(backend="csr", num_users=20000, k=10, processes=None):
+    """Time batch friend suggestions in one process and across a worker pool."""
+    names, edges = scale_free(num_users)
+    graph = build_graph(backend, names, edges)
+    recommender = FriendRecommender(graph, people=[])
+
+    print(Fore.GREEN + f"\nTop-{k} suggestions for all {num_users} users of a scale-free network ({backend}):")
+    _, single_time = timed(lambda: recommender.recommend_all(k=k, processes=1))
+    _, pool_time = timed(lambda: recommender.recommend_all(k=k, processes=processes))
+    print(f"1 process {single_time:.3f}s, pool of {processes or os.cpu_count()} {pool_time:.3f}s")
+
+
+def benchmark_pagerank(backend="csr", num_users=100000):
+    """Report iterations and wall time of global and personalized PageRank."""
+    names, edges = scale_free(num_users)
+    graph = build_graph(backend, names, edges)
+
+    print(Fore.GREEN + f"\nPageRank on a {num_users}-user scale-free network ({backend}):")
+    for label, seeds in (("global", None), ("personalized", names[:3])):
+        result = pagerank(graph, personalization=seeds)
+        print(f"{label:<12} {result.iterations} iterations in {result.seconds:.3f}s")
+
+
+def benchmark_walk_index(backend="csr", num_users=20000, walks_per_user=10, queries=100, updates=1000):
+    """Report build time, query latency and update cost of the Monte Carlo personalized PageRank index."""
+    names, edges = scale_free(num_users)
+    graph = build_graph(backend, names, edges)
+    rng = random.Random(19)
+
+    index = MonteCarloPageRank(graph, walks_per_user=walks_per_user, seed=1)
+    print(Fore.GREEN + f"\nMonte Carlo PageRank index, {walks_per_user} walks per user on a {num_users}-user scale-free network ({backend}):")
+    print(f"build {index.build_seconds:.3f}s, {index.memory_entries()} stored steps")
+    users = rng.sample(names, queries)
+    _, query_time = timed(lambda: [index.top_k(user) for user in users])
+    pairs = [tuple(rng.sample(names, 2)) for _ in range(updates)]
+    _, add_time = timed(lambda: [graph.addconnection(a, b) for a, b in pairs])
+    _, remove_time = timed(lambda: [graph.removeconnection(a, b) for a, b in pairs])
+    print(f"top-10 {query_time / queries * 1000:.2f}ms/query, addconnection {add_time / updates * 1000:.2f}ms, "
+          f"removeconnection {remove_time / updates * 1000:.2f}ms (including walk updates)")
+    index.close()
+
+
+def benchmark_betweenness(backend="csr", num_users=2000, pivots=100, time_budget=1.0, processes=None):
+    """Compare exact betweenness (one process and a pool) with the sampled estimate."""
+    names, edges = scale_free(num_users)
+    graph = build_graph(backend, names, edges)
+
+    print(Fore.GREEN + f"\nBetweenness on a {num_users}-user scale-free network ({backend}):")
+    exact = betweenness_centrality(graph, processes=1)
+    pooled = betweenness_centrality(graph, processes=processes)
+    print(f"exact 1 process {exact.seconds:.3f}s, pool of {processes or os.cpu_count()} {pooled.seconds:.3f}s")
+    for label, result in ((f"{pivots} pivots", betweenness_centrality(graph, k=pivots, seed=1, processes=1)),
+                          (f"{time_budget}s budget", betweenness_centrality(graph, time_budget=time_budget, seed=1, processes=1))):
+        broker = max(exact.scores, key=exact.scores.get)
+        worst = max(abs(result.scores[name] - exact.scores[name]) for name in names)
+        print(f"{label:<12} {result.sources} sources in {result.seconds:.3f}s, top broker {result.scores[broker]:.4f} "
+              f"+/- {result.errors[broker]:.4f} (exact {exact.scores[broker]:.4f}), largest error {worst:.4f}")
+
+
+def benchmark_communities(backend="csr", num_users=100000, num_connections=1000000):
+    """Time Louvain and label propagation on a small world, then vectorized label propagation on a million connections."""
+    names, edges = small_world(num_users)
+    graph = build_graph(backend, names, edges)
+    snapshot = graph.snapshot()
+
+    print(Fore.GREEN + f"\nCommunities in a {num_users}-user small world ({backend}):")
+    print(f"{'method':<18} {'iterations':>10} {'communities':>12} {'modularity':>11} {'time':>9}")
+    methods = [("louvain", lambda: louvain(snapshot, seed=1)),
+               ("label propagation", lambda: label_propagation(snapshot, seed=1))]
+    if np is not None:
+        methods.append(("vectorized", lambda: label_propagation(snapshot, seed=1, vectorized=True)))
+    for label, method in methods:
+        result = method()
+        count = len(set(result.communities.values()))
+        print(f"{label:<18} {result.iterations:>10} {count:>12} {result.modularity:>11.4f} {result.seconds:>8.3f}s")
+
+    if np is not None:
+        names, edges = random_network(num_users, num_connections)
+        result = label_propagation(build_graph(backend, names, edges), seed=1, vectorized=True)
+        print(f"vectorized label propagation on {num_connections} connections: "
+              f"{result.iterations} iterations in {result.seconds:.3f}s")
+
+
+def benchmark_hyperanf(backend="csr", num_users=100000, precisions=(6, 8), samples=50):
+    """Compare HyperANF's average distance with exact BFS from a sample of users."""
+    names, edges = small_world(num_users)
+    graph = build_graph(backend, names, edges)
+    snapshot = graph.snapshot()
+
+    print(Fore.GREEN + f"\nDegrees of separation across a {num_users}-user small world ({backend}):")
+    sources = random.Random(23).sample(range(num_users), samples)
+    distances, bfs_time = timed(lambda: [d for source in sources for d in bfs_distances(graph, source) if d > 0])
+    print(f"BFS from {samples} users: average {sum(distances) / len(distances):.3f} hops in {bfs_time:.3f}s")
+    if np is None:
+        return
+    for precision in precisions:
+        result = hyperanf(snapshot, precision=precision)
+        print(f"HyperANF 2^{precision} registers: average {result.average_distance:.3f} hops, "
+              f"effective diameter {result.effective_diameter:.2f}, {result.iterations} iterations in {result.seconds:.3f}s")
+
+
+def benchmark_diameter(backend="csr", num_users=50000):
+    """Report the BFS runs and time needed for the exact diameter and radius."""
+    names, edges = scale_free(num_users)
+    graph = build_graph(backend, names, edges)
+    snapshot = graph.snapshot()
+
+    print(Fore.GREEN + f"\nExact diameter and radius of a {num_users}-user scale-free network ({backend}):")
+    for label, function in (("diameter", diameter), ("radius", radius)):
+        result = function(snapshot)
+        print(f"{label:<8} {result.value} after {result.sweeps} BFS runs in {result.seconds:.3f}s")
+
+
+def benchmark_hop_histogram(backend="csr", num_users=3000, processes=None):
+    """Time the exact all-pairs hop histogram in one process and across a worker pool, against HyperANF."""
+    names, edges = small_world(num_users)
+    graph = build_graph(backend, names, edges)
+    snapshot = graph.snapshot()
+
+    print(Fore.GREEN + f"\nAll-pairs degrees of separation on a {num_users}-user small world ({backend}):")
+    single = hop_histogram(snapshot, processes=1)
+    pooled = hop_histogram(snapshot, processes=processes)
+    pairs = sum(single.histogram[1:])
+    average = sum(hops * count for hops, count in enumerate(single.histogram)) / pairs
+    print(f"exact average {average:.3f} hops, 1 process {single.seconds:.3f}s, "
+          f"pool of {processes or os.cpu_count()} {pooled.seconds:.3f}s")
+    if np is not None:
+        estimate = hyperanf(snapshot)
+        print(f"HyperANF estimate {estimate.average_distance:.3f} hops in {estimate.seconds:.3f}s")
+
+
+def benchmark_bfs(backend="csr", num_users=200000, num_connections=2000000, sources=10):
+    """Compare the one-user-at-a-time BFS with the vectorized level-synchronous BFS."""
+    names, edges = random_network(num_users, num_connections)
+    graph = build_graph(backend, names, edges)
+    starts = random.Random(29).sample(range(num_users), sources)
+
+    print(Fore.GREEN + f"\nHop distances from {sources} users, {num_users} users, {num_connections} connections ({backend}):")
+    _, python_time = timed(lambda: [bfs_distances(graph, start) for start in starts])
+    print(f"python BFS        {python_time / sources * 1000:.1f}ms/source")
+    if np is None:
+        return
+    snapshot, snapshot_time = timed(graph.snapshot)
+    print(f"snapshot          {snapshot_time:.3f}s (taken once, reused until the graph changes)")
+    for label, alpha in (("top-down only", 0), ("direction-optimizing", 15)):
+        results, vector_time = timed(lambda: [hop_distances(snapshot, names[start], alpha=alpha) for start in starts])
+        print(f"{label:<20} {vector_time / sources * 1000:.1f}ms/source, steps {' '.join(results[0].directions)}")
+
+
+# Adjacency lists copied to each worker of the startup benchmark
+_copied_rows = None
+
+
+def _receive_rows(adjacency):
+    """Initializer that receives a copy of the adjacency lists."""
+    global _copied_rows
+    _copied_rows = adjacency
+
+
+def _copied_row_count(_):
+    return len(_copied_rows)
+
+
+def _shared_row_count(_):
+    return len(worker_rows())
+
+
+def benchmark_shared_graph(backend="csr", sizes=((20000, 100000), (200000, 1000000)), processes=None):
+    """Time worker pool startup with copied adjacency lists against attaching to a SharedGraph."""
+    processes = processes or os.cpu_count() or 1
+    print(Fore.GREEN + f"\nStartup of a pool of {processes} workers that all need the graph ({backend}):")
+    for num_users, num_connections in sizes:
+        names, edges = random_network(num_users, num_connections)
+        snapshot = build_graph(backend, names, edges).snapshot()
+        adjacency = snapshot.adjacency()
+        with SharedGraph.publish(snapshot) as shared:
+            for method in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context(method)
+                for label, initializer, argument, task in (
+                        ("copied lists", _receive_rows, adjacency, _copied_row_count),
+                        ("shared graph", attach_worker, shared.name, _shared_row_count)):
+                    def start_pool():
+                        with context.Pool(processes, initializer=initializer, initargs=(argument,)) as pool:
+                            pool.map(task, range(processes), chunksize=1)
+                    _, seconds = timed(start_pool)
+                    print(f"{num_connections:>8} connections, {method:<10} {label:<13} {seconds:.3f}s")
+
+
+def main():
+    benchmark_backends()
+    benchmark_growth()
+    benchmark_removal()
+    benchmark_clustering()
+    benchmark_cores()
+    benchmark_shortest_path()
+    benchmark_landmarks()
+    benchmark_labeling()
+    benchmark_recommendations()
+    benchmark_pagerank()
+    benchmark_walk_index()
+    benchmark_betweenness()
+    benchmark_communities()
+    benchmark_hyperanf()
+    benchmark_diameter()
+    benchmark_hop_histogram()
+    benchmark_bfs()
+    benchmark_shared_graph()
+
+
+if __name__ == "__main__":
+    main()
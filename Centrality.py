@@ -0,0 +1,462 @@
+import heapq  # For picking the top-k suggestions
+import math  # For the standard error of sampled betweenness
+import os  # For the default number of worker processes
+import random  # For the random walks of the Monte Carlo index and the betweenness pivots
+import time  # For reporting how long each computation took
+from array import array  # For compact storage of the random walks
+from collections import deque, namedtuple  # For the BFS queue and the result records
+from multiprocessing import Pool  # For splitting the betweenness sources across worker processes
+from colorama import Fore  # For format text output in the console with colors.
+from SharedGraph import SharedGraph, attach_worker, worker_rows  # For handing the graph to worker processes without copying it
+from Snapshot import GraphSnapshot  # For the array-encoded graph the algorithms run on
+
+try:
+    import numpy as np  # Optional: vectorizes the power iteration when available.
+except ImportError:
+    np = None
+
+
+# Result of a PageRank run: scores maps user -> rank (summing to 1)
+PageRankResult = namedtuple("PageRankResult", ["scores", "iterations", "seconds", "converged"])
+
+# Result of a betweenness run: scores and errors map user -> value; sources is the number of BFS sources used
+BetweennessResult = namedtuple("BetweennessResult", ["scores", "errors", "sources", "seconds", "exact"])
+
+
+def _teleport_vector(snapshot, personalization):
+    """Return the teleport distribution as a list of weights per vertex."""
+    count = len(snapshot)
+    if not personalization:
+        return [1 / count] * count  # Plain PageRank: jump anywhere uniformly
+    if not isinstance(personalization, dict):
+        personalization = {user: 1 for user in personalization}  # Seed users share the jumps equally
+    weights = [0.0] * count
+    for user, weight in personalization.items():
+        if user in snapshot.position:
+            weights[snapshot.position[user]] = weight
+    total = sum(weights)
+    if total <= 0:
+        raise ValueError("Personalization must give a positive weight to at least one existing user.")
+    return [weight / total for weight in weights]
+
+
+def _pagerank_numpy(snapshot, damping, teleport, tol, max_iter):
+    """Power iteration as sparse matrix-vector products over the CSR arrays."""
+    count = len(snapshot)
+    offsets, indices = snapshot.arrays()
+    degrees = np.diff(offsets)
+    sources = np.repeat(np.arange(count), degrees)  # Source vertex of every stored edge
+    dangling = degrees == 0  # Users without friends pass their rank on through the teleport vector
+    inverse_degree = np.divide(1.0, degrees, out=np.zeros(count), where=~dangling)
+    teleport = np.asarray(teleport, dtype=np.float64)
+    rank = teleport.copy() if np.any(teleport != teleport[0]) else np.full(count, 1 / count)
+
+    for iteration in range(1, max_iter + 1):
+        shares = (rank * inverse_degree)[sources]  # What each edge carries this round
+        spread = np.bincount(indices, weights=shares, minlength=count)
+        new_rank = damping * spread + (damping * rank[dangling].sum() + 1 - damping) * teleport
+        error = np.abs(new_rank - rank).sum()
+        rank = new_rank
+        if error < count * tol:
+            return rank.tolist(), iteration, True
+    return rank.tolist(), max_iter, False
+
+
+def _pagerank_python(snapshot, damping, teleport, tol, max_iter):
+    """Pure-Python power iteration, used when NumPy is not installed."""
+    count = len(snapshot)
+    adjacency = snapshot.adjacency()
+    rank = list(teleport) if len(set(teleport)) > 1 else [1 / count] * count
+
+    for iteration in range(1, max_iter + 1):
+        spread = [0.0] * count
+        dangling_rank = 0.0
+        for vertex, neighbors in enumerate(adjacency):
+            if neighbors:
+                share = rank[vertex] / len(neighbors)
+                for neighbor in neighbors:
+                    spread[neighbor] += share
+            else:
+                dangling_rank += rank[vertex]
+        jump = damping * dangling_rank + 1 - damping
+        new_rank = [damping * spread[v] + jump * teleport[v] for v in range(count)]
+        error = sum(abs(new - old) for new, old in zip(new_rank, rank))
+        rank = new_rank
+        if error < count * tol:
+            return rank, iteration, True
+    return rank, max_iter, False
+
+
+def pagerank(graph, damping=0.85, tol=1.0e-6, max_iter=100, personalization=None):
+    """
+    Rank users by influence with PageRank.
+
+    Parameters:
+    graph (AdjacencyMatrix or GraphSnapshot): The friendship graph.
+    damping (float): Probability of following a friendship rather than jumping.
+    tol (float): Stop once the total change per user drops below this.
+    max_iter (int): Give up after this many iterations.
+    personalization: Seed users (list of names, or dict of name -> weight) that
+        every jump returns to, for personalized PageRank. None means all users.
+
+    Returns a PageRankResult(scores, iterations, seconds, converged).
+
+    """
+    start = time.perf_counter()
+    snapshot = GraphSnapshot.of(graph)
+    if len(snapshot) == 0:
+        return PageRankResult({}, 0, 0.0, True)
+    teleport = _teleport_vector(snapshot, personalization)
+    if np is not None:
+        rank, iterations, converged = _pagerank_numpy(snapshot, damping, teleport, tol, max_iter)
+    else:
+        rank, iterations, converged = _pagerank_python(snapshot, damping, teleport, tol, max_iter)
+    scores = dict(zip(snapshot.names, rank))
+    return PageRankResult(scores, iterations, time.perf_counter() - start, converged)
+
+
+class MonteCarloPageRank:
+    """
+    Monte Carlo personalized PageRank index for real-time "who to follow".
+
+    walks_per_user short random walks (segments) are stored for every user.
+    Each step stops with probability reset_probability and otherwise moves
+    to a random friend, as in PageRank. The personalized PageRank of a user
+    is estimated by stitching stored segments together: an episode starts
+    at the user and either stops or steps to a random friend and continues
+    along one of that friend's unused segments. Visit frequencies over the
+    episodes converge to the personalized PageRank with damping
+    1 - reset_probability, so queries never run a power iteration.
+
+    The index registers itself as a listener of the graph, and only the
+    stored walks that cross a changed connection are rerouted, so it stays
+    valid as users and connections come and go.
+
+    """
+
+    def __init__(self, graph, walks_per_user=10, reset_probability=0.15, seed=None):
+        """
+        Parameters:
+        graph (AdjacencyMatrix): The friendship graph to index.
+        walks_per_user (int): Number of stored segments per user (R).
+        reset_probability (float): Chance of stopping a walk at each step.
+        seed: Seed for the random walks, for reproducible results.
+
+        """
+        self.graph = graph
+        self.walks_per_user = walks_per_user
+        self.reset_probability = reset_probability
+        self.rng = random.Random(seed)
+        self.segments = []  # Per index: its stored walks, each an array of indices starting at that index
+        self.visits = []  # Per index: ids (start * walks_per_user + r) of the stored walks that pass through it
+        self.build_seconds = 0.0
+        self.build()
+        graph.add_listener(self)
+
+    def close(self):
+        """Stop following changes to the graph."""
+        self.graph.remove_listener(self)
+
+    def build(self):
+        """(Re)generate every stored walk from the current graph."""
+        start = time.perf_counter()
+        count = len(self.graph.names)
+        self.segments = [[] for _ in range(count)]
+        self.visits = [set() for _ in range(count)]
+        for index, name in enumerate(self.graph.names):
+            if name is not None:
+                self._add_walks(index)
+        self.build_seconds = time.perf_counter() - start
+
+    def memory_entries(self):
+        """Return the total number of steps stored across all walks."""
+        return sum(len(path) for walks in self.segments for path in walks)
+
+    def _continue_walk(self, path):
+        """Extend a walk from its last index until it resets or reaches a user without friends."""
+        graph, rng, reset = self.graph, self.rng, self.reset_probability
+        node = path[-1]
+        while rng.random() >= reset:
+            friends = graph.neighbor_index_list(node)
+            if not friends:
+                break  # Dead end: PageRank jumps back to the start
+            node = rng.choice(friends)
+            path.append(node)
+        return path
+
+    def _store(self, walk_id, path):
+        """Replace the walk with the given id, keeping the reverse index in sync."""
+        start, r = divmod(walk_id, self.walks_per_user)
+        walks = self.segments[start]
+        if r < len(walks):
+            for node in set(walks[r]):
+                self.visits[node].discard(walk_id)
+            walks[r] = path
+        else:
+            walks.append(path)
+        for node in set(path):
+            self.visits[node].add(walk_id)
+
+    def _add_walks(self, index):
+        """Generate the stored walks of a single user."""
+        for r in range(self.walks_per_user):
+            self._store(index * self.walks_per_user + r, self._continue_walk(array('i', [index])))
+
+    def _path(self, walk_id):
+        start, r = divmod(walk_id, self.walks_per_user)
+        return self.segments[start][r]
+
+    # Graph listener hooks
+
+    def on_user_added(self, index):
+        while len(self.segments) <= index:
+            self.segments.append([])
+            self.visits.append(set())
+        self._add_walks(index)
+
+    def on_user_removed(self, index):
+        # Walks passing through the user were rerouted when its connections were removed
+        for r in range(len(self.segments[index])):
+            walk_id = index * self.walks_per_user + r
+            for node in set(self.segments[index][r]):
+                self.visits[node].discard(walk_id)
+        self.segments[index] = []
+
+    def on_connection_added(self, idx1, idx2):
+        graph, rng = self.graph, self.rng
+        other = {idx1: idx2, idx2: idx1}
+        degree = {idx1: graph.degree_counts[idx1], idx2: graph.degree_counts[idx2]}
+        # Each affected walk is visited once, so a rerouted walk (already drawn from the new graph) is not rerouted again
+        for walk_id in self.visits[idx1] | self.visits[idx2]:
+            path = self._path(walk_id)
+            for position, node in enumerate(path):
+                if node not in other:
+                    continue
+                if position + 1 < len(path):
+                    # The walk moved on from here; it would now have taken the new friendship 1 / degree of the time
+                    if rng.random() * degree[node] < 1:
+                        self._store(walk_id, self._continue_walk(path[:position + 1] + array('i', [other[node]])))
+                        break
+                elif degree[node] == 1 and rng.random() >= self.reset_probability:
+                    # The walk ended at a user without friends and may now continue
+                    self._store(walk_id, self._continue_walk(path + array('i', [other[node]])))
+
+    def on_connection_removed(self, idx1, idx2):
+        for node, old_friend in ((idx1, idx2), (idx2, idx1)):
+            for walk_id in list(self.visits[node]):
+                path = self._path(walk_id)
+                for position in range(len(path) - 1):
+                    if path[position] == node and path[position + 1] == old_friend:
+                        # Redo the step that used the removed connection with the remaining friends
+                        rerouted = path[:position + 1]
+                        friends = self.graph.neighbor_index_list(node)
+                        if friends:
+                            rerouted.append(self.rng.choice(friends))
+                            self._continue_walk(rerouted)
+                        self._store(walk_id, rerouted)
+                        break
+
+    def on_compact(self, keep):
+        new_index = {old: new for new, old in enumerate(keep)}
+        self.segments = [[array('i', [new_index[node] for node in path]) for path in self.segments[old]]
+                         for old in keep]
+        self.visits = [set() for _ in keep]
+        for start, walks in enumerate(self.segments):
+            for r, path in enumerate(walks):
+                for node in set(path):
+                    self.visits[node].add(start * self.walks_per_user + r)
+
+    # Queries
+
+    def ppr(self, user, num_episodes=2000):
+        """
+        Estimate the personalized PageRank of every user seen from the given user.
+
+        Returns a dictionary mapping user name -> score (summing to 1) over the
+        users the walks reached, or an empty dictionary if the user is unknown.
+
+        """
+        graph = self.graph
+        if user not in graph.users:
+            print(f"{Fore.RED}User {user} not found.")
+            return {}
+        source = graph.users[user]
+        rng, reset = self.rng, self.reset_probability
+        counts = {}
+        # The user's own stored walks are complete episodes already
+        for path in self.segments[source]:
+            for node in path:
+                counts[node] = counts.get(node, 0) + 1
+        friends = graph.neighbor_index_list(source)
+        used = {}  # Index -> number of its stored walks already stitched into this query
+        for _ in range(max(num_episodes - len(self.segments[source]), 0)):
+            counts[source] = counts.get(source, 0) + 1
+            if not friends or rng.random() < reset:
+                continue
+            friend = rng.choice(friends)
+            taken = used.get(friend, 0)
+            if taken < len(self.segments[friend]):
+                path = self.segments[friend][taken]  # Stitch on an unused stored walk of the friend
+                used[friend] = taken + 1
+            else:
+                path = self._continue_walk([friend])  # Stored walks ran out; walk live
+            for node in path:
+                counts[node] = counts.get(node, 0) + 1
+        total = sum(counts.values())
+        return {graph.names[node]: visits / total for node, visits in counts.items()}
+
+    def top_k(self, user, k=10, num_episodes=2000):
+        """Return up to k [(user, score), ...] non-friends with the highest personalized PageRank, best first."""
+        scores = self.ppr(user, num_episodes)
+        if not scores:
+            return []
+        excluded = set(self.graph.neighbors(user))
+        excluded.add(user)
+        candidates = ((name, score) for name, score in scores.items() if name not in excluded)
+        return heapq.nlargest(k, candidates, key=lambda item: item[1])
+
+
+def _source_dependencies(adjacency, source, dist, sigma, delta):
+    """
+    Run one Brandes pass from source and return the vertices it reached.
+
+    dist, sigma and delta are scratch lists of length len(adjacency) filled
+    with -1, 0 and 0.0; on return delta[v] holds the dependency of source on
+    every reached vertex v. The caller resets the reached entries afterwards.
+
+    """
+    dist[source] = 0
+    sigma[source] = 1
+    order = []  # Vertices in non-decreasing distance from source
+    queue = deque([source])
+    while queue:
+        vertex = queue.popleft()
+        order.append(vertex)
+        next_distance = dist[vertex] + 1
+        for neighbor in adjacency[vertex]:
+            if dist[neighbor] < 0:
+                dist[neighbor] = next_distance
+                queue.append(neighbor)
+            if dist[neighbor] == next_distance:
+                sigma[neighbor] += sigma[vertex]  # Every shortest path to vertex extends to neighbor
+    # Accumulate dependencies from the farthest vertices back towards source
+    for vertex in reversed(order):
+        coefficient = (1 + delta[vertex]) / sigma[vertex]
+        previous_distance = dist[vertex] - 1
+        for neighbor in adjacency[vertex]:
+            if dist[neighbor] == previous_distance:
+                delta[neighbor] += sigma[neighbor] * coefficient
+    delta[source] = 0.0  # A user never lies between itself and someone else
+    return order
+
+
+def _betweenness_sums(adjacency, sources, deadline=None):
+    """
+    Return (sources used, sum, sum of squares) of the dependencies of every vertex over the given sources.
+
+    With a deadline (a time.time() value) no new source is started once it has passed.
+
+    """
+    count = len(adjacency)
+    sums, squares = [0.0] * count, [0.0] * count
+    dist, sigma, delta = [-1] * count, [0] * count, [0.0] * count
+    used = 0
+    for source in sources:
+        if deadline is not None and time.time() >= deadline:
+            break
+        for vertex in _source_dependencies(adjacency, source, dist, sigma, delta):
+            value = delta[vertex]
+            sums[vertex] += value
+            squares[vertex] += value * value
+            dist[vertex], sigma[vertex], delta[vertex] = -1, 0, 0.0
+        used += 1
+    return used, sums, squares
+
+
+def _betweenness_chunk(task):
+    """Sum the dependencies of a chunk of sources inside a worker process, stopping at the deadline."""
+    sources, deadline = task
+    if deadline is not None and time.time() >= deadline:
+        return 0, None, None  # Too late to start; skip sending back empty sums
+    return _betweenness_sums(worker_rows(), sources, deadline)
+
+
+def betweenness_centrality(graph, k=None, time_budget=None, normalized=True, seed=None,
+                           processes=None, chunk_size=64):
+    """
+    Find "broker" users with Brandes' betweenness centrality.
+
+    With k=None and no time_budget every user is a BFS source and the scores
+    match nx.betweenness_centrality. Otherwise k pivot sources (all users by
+    default) are drawn at random and processed until they run out or
+    time_budget seconds have passed; the scores are then unbiased estimates
+    and errors holds the standard error of each one (0 for exact runs).
+
+    Parameters:
+    graph (AdjacencyMatrix or GraphSnapshot): The friendship graph.
+    k (int): Number of pivot sources to sample, or None for all users.
+    time_budget (float): Stop starting new sources after this many seconds (checked before every source, in every worker).
+    normalized (bool): Divide by the number of pairs, as NetworkX does.
+    seed: Seed for picking the pivots.
+    processes (int): Worker processes (os.cpu_count() by default; 1 runs in this process).
+    chunk_size (int): Sources handed to a worker at a time.
+
+    Returns a BetweennessResult(scores, errors, sources, seconds, exact).
+
+    """
+    start = time.perf_counter()
+    snapshot = GraphSnapshot.of(graph)
+    count = len(snapshot)
+    sources = list(range(count))
+    if k is not None and k < count:
+        sources = random.Random(seed).sample(sources, k)
+    elif time_budget is not None:
+        random.Random(seed).shuffle(sources)  # Any prefix of the order is then a uniform sample
+
+    processes = processes or os.cpu_count() or 1
+    # Wall-clock time, so worker processes can check the same deadline between sources
+    deadline = None if time_budget is None else time.time() + time_budget
+    chunks = [sources[i:i + chunk_size] for i in range(0, len(sources), chunk_size)]
+    totals, total_squares = [0.0] * count, [0.0] * count
+    used = 0
+
+    def add(result):
+        """Fold a chunk's sums into the running totals."""
+        nonlocal used
+        chunk_count, sums, squares = result
+        if chunk_count == 0:
+            return
+        used += chunk_count
+        for vertex in range(count):
+            totals[vertex] += sums[vertex]
+            total_squares[vertex] += squares[vertex]
+
+    if processes == 1 or len(chunks) <= 1:
+        # Plain lists are faster to walk in this process; the pool reads the shared arrays instead
+        add(_betweenness_sums(snapshot.adjacency(), sources, deadline))
+    else:
+        with SharedGraph.publish(snapshot) as shared, \
+                Pool(processes, initializer=attach_worker, initargs=(shared.name,)) as pool:
+            # Once the deadline passes, workers finish their current source and the remaining chunks return at once
+            for result in pool.imap_unordered(_betweenness_chunk, [(chunk, deadline) for chunk in chunks]):
+                add(result)
+
+    # Pairs are counted in both directions; normalizing divides by (n - 1)(n - 2) ordered pairs
+    if normalized:
+        scale = 1 / ((count - 1) * (count - 2)) if count > 2 else 1.0
+    else:
+        scale = 0.5
+    exact = used == count
+    scores, errors = {}, {}
+    for vertex, name in enumerate(snapshot.names):
+        if exact or used == 0:
+            scores[name], errors[name] = totals[vertex] * scale, 0.0
+            continue
+        # Each pivot gives an unbiased estimate count * delta; average them and
+        # shrink the variance for sampling without replacement
+        mean = totals[vertex] / used
+        variance = max(total_squares[vertex] / used - mean * mean, 0.0)
+        correction = (count - used) / (count - 1)
+        scores[name] = count * mean * scale
+        errors[name] = count * scale * math.sqrt(variance / used * correction)
+    return BetweennessResult(scores, errors, used, time.perf_counter() - start, exact)
@@ -2,6 +2,26 @@ import networkx as nx
 import matplotlib.pyplot as plt
 from colorama import Fore, Style, init
 from Graph import AdjacencyMatrix
+from Centrality import pagerank
+
+
+def print_traversal(name, start_user, traversal):
+    """
+    Print the users produced by a traversal generator as they arrive, indented by depth.
+
+    Parameters:
+    name (str): The traversal name shown in the header ("BFS" or "DFS").
+    start_user (str): The user the traversal starts from.
+    traversal: An iterator of (user, depth, parent) tuples from iter_bfs/iter_dfs.
+
+    """
+    header_printed = False
+    for user, depth, parent in traversal:
+        if not header_printed:
+            print(Fore.GREEN + f"{name} traversal starting from {start_user}:")
+            header_printed = True
+        via = f" (via {parent})" if parent is not None else ""
+        print("  " * depth + user + via)
 
 
 def cli_menu(graph):
@@ -26,7 +46,9 @@ def cli_menu(graph):
         print("9. Average Friends Per User")
         print("10. Network Density")
         print("11. Clustering Coefficient")
-        print("12. Exit")
+        print("12. PageRank")
+        print("13. K-Core Decomposition")
+        print("14. Exit")
         print(Fore.CYAN + Style.BRIGHT + "---------------------------")
 
         choice = input(Fore.WHITE + "Enter your choice: ") # Prompt user for their menu choice
@@ -52,31 +74,63 @@ def cli_menu(graph):
             graph.visualize()
         elif choice == '7':
             start_user = input("Enter starting user for DFS: ")
-            graph.dfs(start_user)
-            print()
+            print_traversal("DFS", start_user, graph.iter_dfs(start_user))
             input("Press Enter to continue...")
         elif choice == '8':
             start_user = input("Enter starting user for BFS: ")
-            graph.bfs(start_user)
-            print()
+            print_traversal("BFS", start_user, graph.iter_bfs(start_user))
             input("Press Enter to continue...")
         elif choice == '9':
-            avg_friends = graph.average_friends_per_user()
+            avg_friends = graph.average_friends_per_user()  # Read from the maintained counters
             print(f"Average number of friends per user: {avg_friends:.2f}")
+            print(f"({graph.num_connections} connections among {graph.num_users} users)")
             input("Press Enter to continue...")
         elif choice == '10':
-            density = graph.network_density()
+            density = graph.network_density()  # Read from the maintained counters
             print(f"Network density: {density:.2f}")
+            print(f"({graph.num_connections} connections among {graph.num_users} users)")
             input("Press Enter to continue...")
         elif choice == '11':
             clustering_coeff = graph.clustering_coefficient()
             print(f"Clustering coefficient: {clustering_coeff:.2f}")
             input("Press Enter to continue...")
         elif choice == '12':
+            seeds = input("Seed users for personalized PageRank (comma separated, blank for all): ")
+            seeds = [seed.strip() for seed in seeds.split(",") if seed.strip()]
+            try:
+                result = pagerank(graph, personalization=seeds or None)
+            except ValueError as error:
+                print(Fore.RED + str(error))
+            else:
+                print(Fore.GREEN + "Most influential users:")
+                top = sorted(result.scores.items(), key=lambda item: item[1], reverse=True)[:10]
+                for rank, (user, score) in enumerate(top, 1):
+                    print(f"{rank}. {user}: {score:.4f}")
+                status = "converged" if result.converged else "did not converge"
+                print(f"({status} after {result.iterations} iterations in {result.seconds * 1000:.1f} ms)")
+            input("Press Enter to continue...")
+        elif choice == '13':
+            cores = graph.core_numbers()
+            if cores:
+                print(Fore.GREEN + f"Largest core number: {max(cores.values())}")
+                users_per_core = {}
+                for core in cores.values():
+                    users_per_core[core] = users_per_core.get(core, 0) + 1
+                for core in sorted(users_per_core):
+                    print(f"core {core}: {users_per_core[core]} users")
+                k = input("Show the users of the k-core for k (blank to skip): ")
+                if k.strip().isdigit():
+                    core_graph = graph.k_core(int(k))
+                    print(f"{int(k)}-core: {core_graph.num_users} users, {core_graph.num_connections} connections")
+                    print(", ".join(core_graph.get_all_users()))
+            else:
+                print(Fore.RED + "The network has no users.")
+            input("Press Enter to continue...")
+        elif choice == '14':
             print(Fore.GREEN + "Exiting program...")
             break
         else:
-            print(Fore.RED + "Invalid choice. Please enter a number from 1 to 12.")
+            print(Fore.RED + "Invalid choice. Please enter a number from 1 to 14.")
             input("Press Enter to continue...")
 
 
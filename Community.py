@@ -0,0 +1,265 @@
+import random  # For the random visiting orders and tie-breaking
+import time  # For reporting how long each computation took
+from collections import namedtuple  # For the result records
+from Snapshot import GraphSnapshot  # For the array-encoded graph the algorithms run on
+
+try:
+    import numpy as np  # Optional: needed for the vectorized label propagation.
+except ImportError:
+    np = None
+
+
+# Result of a community detection run: communities maps user -> community number
+# (0 is the largest community), iterations counts sweeps (label propagation) or levels (Louvain)
+CommunityResult = namedtuple("CommunityResult", ["communities", "modularity", "iterations", "seconds"])
+
+
+def _renumber(labels):
+    """Return the labels renumbered 0, 1, ... from the largest community to the smallest."""
+    sizes = {}
+    for label in labels:
+        sizes[label] = sizes.get(label, 0) + 1
+    ranked = sorted(sizes, key=lambda label: -sizes[label])
+    number = {label: position for position, label in enumerate(ranked)}
+    return [number[label] for label in labels]
+
+
+def _modularity(adjacency, labels, resolution=1.0):
+    """Modularity of the vertex labels over neighbour lists (each friendship listed at both ends)."""
+    edges = sum(len(neighbors) for neighbors in adjacency) / 2
+    if edges == 0:
+        return 0.0
+    inside = 0  # Friendship ends that stay inside their community
+    degree_sums = {}  # Community -> total degree of its members
+    for vertex, neighbors in enumerate(adjacency):
+        label = labels[vertex]
+        inside += sum(1 for neighbor in neighbors if labels[neighbor] == label)
+        degree_sums[label] = degree_sums.get(label, 0) + len(neighbors)
+    expected = sum(total * total for total in degree_sums.values()) / (4 * edges * edges)
+    return inside / (2 * edges) - resolution * expected
+
+
+def modularity(graph, communities, resolution=1.0):
+    """
+    Return the modularity of a division of the users into communities.
+
+    Parameters:
+    graph (AdjacencyMatrix or GraphSnapshot): The friendship graph.
+    communities (dict): Maps every user to a community label.
+    resolution (float): Values above 1 favour smaller communities.
+
+    """
+    snapshot = GraphSnapshot.of(graph)
+    labels = [communities[name] for name in snapshot.names]
+    return _modularity(snapshot.adjacency(), labels, resolution)
+
+
+def _louvain_level(neighbors, self_loops, total_weight, resolution, rng):
+    """
+    Greedily move vertices between communities until no move improves modularity.
+
+    neighbors[v] maps each other vertex to the weight between them and
+    self_loops[v] is the weight inside v. Returns (community of each vertex,
+    True if any vertex moved).
+
+    """
+    count = len(neighbors)
+    degrees = [sum(weights.values()) + 2 * self_loops[v] for v, weights in enumerate(neighbors)]
+    community = list(range(count))
+    community_degree = list(degrees)  # Total degree of each community's members
+    order = list(range(count))
+    improved = False
+    moved = True
+    while moved:
+        moved = False
+        rng.shuffle(order)
+        for vertex in order:
+            degree = degrees[vertex]
+            current = community[vertex]
+            # Weight from vertex to each neighbouring community
+            links = {}
+            for neighbor, weight in neighbors[vertex].items():
+                links[community[neighbor]] = links.get(community[neighbor], 0) + weight
+            # Take vertex out of its community, then put it where the modularity gain is largest
+            community_degree[current] -= degree
+            penalty = resolution * degree / (2 * total_weight * total_weight)
+            best, best_gain = current, 0.0
+            remove_cost = -links.get(current, 0) / total_weight + penalty * community_degree[current]
+            for candidate, weight in links.items():
+                gain = remove_cost + weight / total_weight - penalty * community_degree[candidate]
+                if gain > best_gain:
+                    best, best_gain = candidate, gain
+            community_degree[best] += degree
+            if best != current:
+                community[vertex] = best
+                moved = improved = True
+    return community, improved
+
+
+def louvain(graph, resolution=1.0, threshold=1.0e-7, seed=None):
+    """
+    Detect communities with the Louvain method.
+
+    Users are moved greedily to the neighbouring community with the largest
+    modularity gain; the communities found are then merged into single
+    vertices and the process repeats on the smaller graph, until a level
+    improves modularity by no more than threshold.
+
+    Parameters:
+    graph (AdjacencyMatrix or GraphSnapshot): The friendship graph.
+    resolution (float): Values above 1 favour smaller communities.
+    threshold (float): Minimum modularity gain for another level.
+    seed: Seed for the visiting order, for reproducible results.
+
+    Returns a CommunityResult(communities, modularity, iterations, seconds).
+
+    """
+    start = time.perf_counter()
+    snapshot = GraphSnapshot.of(graph)
+    adjacency = snapshot.adjacency()
+    rng = random.Random(seed)
+    labels = list(range(len(snapshot)))  # Community of every user at the current level
+    best_modularity = _modularity(adjacency, labels, resolution)
+    total_weight = snapshot.num_edges
+    levels = 0
+    if total_weight:
+        neighbors = [{neighbor: 1 for neighbor in row} for row in adjacency]
+        self_loops = [0] * len(adjacency)
+        while True:
+            community, improved = _louvain_level(neighbors, self_loops, total_weight, resolution, rng)
+            if not improved:
+                break
+            # Number the communities of this level 0 .. k - 1; they become the next level's vertices
+            number = {}
+            for label in community:
+                number.setdefault(label, len(number))
+            candidate = [number[community[label]] for label in labels]
+            new_modularity = _modularity(adjacency, candidate, resolution)
+            if new_modularity - best_modularity <= threshold:
+                break
+            labels, best_modularity = candidate, new_modularity
+            levels += 1
+            # Collapse every community into one vertex, summing the weights between them
+            merged = [{} for _ in number]
+            merged_loops = [0] * len(number)
+            for vertex, weights in enumerate(neighbors):
+                source = number[community[vertex]]
+                merged_loops[source] += self_loops[vertex]
+                for neighbor, weight in weights.items():
+                    target = number[community[neighbor]]
+                    if target == source:
+                        merged_loops[source] += weight / 2  # Every inside pair is seen from both ends
+                    else:
+                        merged[source][target] = merged[source].get(target, 0) + weight
+            neighbors, self_loops = merged, merged_loops
+
+    communities = dict(zip(snapshot.names, _renumber(labels)))
+    return CommunityResult(communities, best_modularity, levels, time.perf_counter() - start)
+
+
+def _label_propagation_python(adjacency, max_iter, rng):
+    """Asynchronous label propagation: users adopt their friends' most common label one at a time."""
+    labels = list(range(len(adjacency)))
+    order = list(range(len(adjacency)))
+    for iteration in range(1, max_iter + 1):
+        rng.shuffle(order)
+        changed = False
+        for vertex in order:
+            neighbors = adjacency[vertex]
+            if not neighbors:
+                continue  # A user without friends keeps a community of their own
+            counts = {}
+            for neighbor in neighbors:
+                counts[labels[neighbor]] = counts.get(labels[neighbor], 0) + 1
+            best = max(counts.values())
+            if counts.get(labels[vertex], 0) == best:
+                continue  # Already among the most common labels
+            labels[vertex] = rng.choice([label for label, count in counts.items() if count == best])
+            changed = True
+        if not changed:
+            return labels, iteration
+    return labels, max_iter
+
+
+def _label_propagation_numpy(snapshot, max_iter, seed):
+    """
+    Vectorized label propagation over the CSR arrays.
+
+    Every sweep counts the (user, friend's label) pairs with one sort, picks
+    each user's most common label with random tie-breaking, and moves a
+    random half of the users whose label is not among their most common.
+    Updating only half of them at a time stops the two-colour oscillation
+    that fully synchronous updates fall into.
+
+    """
+    count = len(snapshot)
+    rng = np.random.default_rng(seed)
+    offsets, indices = snapshot.arrays()
+    sources = np.repeat(np.arange(count, dtype=np.int64), np.diff(offsets))
+    labels = np.arange(count, dtype=np.int64)
+    if len(indices) == 0:
+        return labels.tolist(), 0  # Without friendships every user stays in a community of their own
+    for iteration in range(1, max_iter + 1):
+        keys, counts = np.unique(sources * count + labels[indices], return_counts=True)
+        key_vertex = keys // count
+        # Random fractions break ties between equally common labels without changing the order otherwise
+        order = np.lexsort((counts + rng.random(len(counts)), key_vertex))
+        group_end = np.flatnonzero(np.append(key_vertex[order][1:] != key_vertex[order][:-1], True))
+        winners = order[group_end]  # Most common label of each user with friends
+        vertices = key_vertex[winners]
+        best_count = counts[winners]
+        same = labels[sources] == labels[indices]
+        current_count = np.bincount(sources[same], minlength=count)[vertices]
+        unsettled = current_count < best_count
+        if not unsettled.any():
+            return labels.tolist(), iteration
+        move = unsettled & (rng.random(len(vertices)) < 0.5)
+        labels[vertices[move]] = keys[winners[move]] % count
+    return labels.tolist(), max_iter
+
+
+def _modularity_numpy(snapshot, labels, resolution=1.0):
+    """Vectorized modularity of the vertex labels over the CSR arrays."""
+    offsets, indices = snapshot.arrays()
+    edges = len(indices) / 2
+    if edges == 0:
+        return 0.0
+    labels = np.asarray(labels, dtype=np.int64)
+    degrees = np.diff(offsets)
+    sources = np.repeat(np.arange(len(snapshot)), degrees)
+    inside = np.count_nonzero(labels[sources] == labels[indices])
+    degree_sums = np.bincount(labels, weights=degrees)
+    return float(inside / (2 * edges) - resolution * (degree_sums ** 2).sum() / (4 * edges * edges))
+
+
+def label_propagation(graph, max_iter=100, seed=None, vectorized=False):
+    """
+    Detect communities by label propagation.
+
+    Every user starts in a community of their own and repeatedly joins the
+    community most common among their friends, until every user already
+    belongs to one of the most common communities around them.
+
+    Parameters:
+    graph (AdjacencyMatrix or GraphSnapshot): The friendship graph.
+    max_iter (int): Give up after this many sweeps over the users.
+    seed: Seed for the visiting order and tie-breaking.
+    vectorized (bool): Use the NumPy implementation, which updates users in
+        random batches instead of one at a time and handles million-edge graphs.
+
+    Returns a CommunityResult(communities, modularity, iterations, seconds).
+
+    """
+    start = time.perf_counter()
+    snapshot = GraphSnapshot.of(graph)
+    if vectorized:
+        if np is None:
+            raise ImportError("Vectorized label propagation requires NumPy (pip install numpy).")
+        labels, iterations = _label_propagation_numpy(snapshot, max_iter, seed)
+        score = _modularity_numpy(snapshot, labels)
+    else:
+        adjacency = snapshot.adjacency()
+        labels, iterations = _label_propagation_python(adjacency, max_iter, random.Random(seed))
+        score = _modularity(adjacency, labels)
+    communities = dict(zip(snapshot.names, _renumber(labels)))
+    return CommunityResult(communities, score, iterations, time.perf_counter() - start)
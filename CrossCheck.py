@@ -0,0 +1,379 @@
+import os  # For the temporary file of the labeling round trip.
+import random  # For generating reproducible random networks and changes.
+import tempfile  # For the temporary file of the labeling round trip.
+import sys  # For the exit status when a check fails.
+from colorama import Fore, init  # For format text output in the console with colors.
+import networkx as nx  # For the reference implementations the results are compared with.
+from Graph import AdjacencyMatrix
+from DistanceIndex import LandmarkIndex, PrunedLandmarkLabeling
+from Recommender import FriendRecommender, METRICS
+from Centrality import pagerank, betweenness_centrality, MonteCarloPageRank
+from Community import modularity, louvain, label_propagation
+from Analytics import diameter, radius, hop_histogram, hyperanf, bfs_order
+from Storage import np  # None when NumPy is not installed
+
+
+# Initialize colorama
+init(autoreset=True)
+
+
+def available_backends():
+    """Return the storage backends that can run in this environment."""
+    backends = ["dense", "csr", "bitset"]
+    if np is not None:
+        backends.append("numpy")
+    return backends
+
+
+def random_graphs(rng, backend):
+    """
+    Build a random AdjacencyMatrix and the same graph in NetworkX.
+
+    Users and connections are added, then some users and connections are
+    removed again, so tombstones, reused slots and compaction are exercised
+    along with the storage backend.
+
+    """
+    num_users = rng.randint(1, 40)
+    graph = AdjacencyMatrix(backend=backend, track_triangles=rng.random() < 0.5)
+    G = nx.Graph()
+    names = [f"u{i}" for i in range(num_users)]
+    for name in names:
+        graph.adduser(name)
+        G.add_node(name)
+    if num_users > 1:
+        for _ in range(rng.randint(0, 3 * num_users)):
+            user1, user2 = rng.sample(names, 2)
+            graph.addconnection(user1, user2)
+            G.add_edge(user1, user2)
+    for user in rng.sample(list(G), rng.randint(0, num_users // 3)):
+        graph.removeuser(user)
+        G.remove_node(user)
+    for user1, user2 in rng.sample(list(G.edges), min(G.number_of_edges(), rng.randint(0, num_users))):
+        graph.removeconnection(user1, user2)
+        G.remove_edge(user1, user2)
+    for name in rng.sample(names, min(num_users, rng.randint(0, 3))):
+        if name not in G:
+            graph.adduser(name)  # Reuses a removed user's slot
+            G.add_node(name)
+    return graph, G
+
+
+def edgeless_graphs(backend):
+    """Yield graphs without any connections (no users, one user, several users), with their NetworkX copies."""
+    for num_users in (0, 1, 5):
+        graph = AdjacencyMatrix(backend=backend)
+        G = nx.Graph()
+        for i in range(num_users):
+            graph.adduser(f"u{i}")
+            G.add_node(f"u{i}")
+        yield graph, G
+
+
+def close(value, expected, tolerance=1.0e-9):
+    return abs(value - expected) <= tolerance
+
+
+def check_structure(graph, G, rng):
+    """Users, friendships and degrees."""
+    if set(graph.users) != set(G):
+        return "users differ"
+    if graph.num_connections != G.number_of_edges():
+        return "connection counts differ"
+    if graph.degrees() != dict(G.degree) or not graph.verify_counters():
+        return "degrees differ"
+    for user in G:
+        if set(graph.neighbors(user)) != set(G[user]):
+            return f"friends of {user} differ"
+    for _ in range(20):
+        if len(G) > 1:
+            user1, user2 = rng.sample(list(G), 2)
+            if graph.has_connection(user1, user2) != G.has_edge(user1, user2):
+                return f"has_connection({user1}, {user2}) differs"
+    return None
+
+
+def check_triangles(graph, G, rng):
+    """Triangle counts and clustering coefficients."""
+    if graph.triangle_counts() != nx.triangles(G):
+        return "triangle counts differ"
+    if len(G) and not close(graph.average_clustering(), nx.average_clustering(G)):
+        return "average clustering differs"
+    if not close(graph.transitivity(), nx.transitivity(G)):
+        return "transitivity differs"
+    return None
+
+
+def check_cores(graph, G, rng):
+    """Core numbers."""
+    if graph.core_numbers() != nx.core_number(G):
+        return "core numbers differ"
+    return None
+
+
+def check_paths(graph, G, rng):
+    """Components, shortest paths and the landmark index, before and after further changes."""
+    components = sorted(sorted(component) for component in graph.connected_components())
+    if components != sorted(sorted(component) for component in nx.connected_components(G)):
+        return "components differ"
+    index = LandmarkIndex(graph, num_landmarks=3)
+    for step in range(2):
+        for _ in range(10):
+            if not G:
+                break
+            user1, user2 = rng.choice(list(G)), rng.choice(list(G))
+            expected = nx.shortest_path_length(G, user1, user2) if nx.has_path(G, user1, user2) else None
+            for found in (graph.shortest_path(user1, user2), index.shortest_path(user1, user2)):
+                if (None if found is None else found[1]) != expected:
+                    return f"shortest path {user1} -> {user2} differs"
+            if index.is_stale():
+                if index.bounds(user1, user2) is not None:
+                    return "a stale landmark index still gives bounds"
+                index.refresh()
+            lower, upper = index.bounds(user1, user2)
+            if not lower <= (float('inf') if expected is None else expected) <= upper:
+                return f"landmark bounds {user1} -> {user2} are wrong"
+        # Change the graph under the index; shortest paths must follow it until the next refresh
+        if len(G) > 1:
+            user1, user2 = rng.sample(list(G), 2)
+            graph.addconnection(user1, user2)
+            G.add_edge(user1, user2)
+            user = rng.choice(list(G))
+            graph.removeuser(user)
+            G.remove_node(user)
+    return None
+
+
+def check_eccentricities(graph, G, rng):
+    """Diameter and radius of the largest component, and the all-pairs hop histogram."""
+    if not G:
+        return None
+    largest = max(len(component) for component in nx.connected_components(G))
+    candidates = [G.subgraph(component) for component in nx.connected_components(G) if len(component) == largest]
+    if diameter(graph).value not in {nx.diameter(component) for component in candidates}:
+        return "diameter differs"
+    if radius(graph).value not in {nx.radius(component) for component in candidates}:
+        return "radius differs"
+    expected = {}
+    for _, lengths in nx.all_pairs_shortest_path_length(G):
+        for hops in lengths.values():
+            expected[hops] = expected.get(hops, 0) + 1
+    histogram = hop_histogram(graph, processes=1).histogram
+    if {hops: pairs for hops, pairs in enumerate(histogram) if pairs} != expected:
+        return "hop histogram differs"
+    return None
+
+
+def check_centrality(graph, G, rng):
+    """Exact betweenness and PageRank."""
+    expected = nx.betweenness_centrality(G)
+    scores = betweenness_centrality(graph, processes=1).scores
+    if any(not close(scores[user], expected[user]) for user in G):
+        return "betweenness differs"
+    if G:
+        expected = nx.pagerank(G, tol=1.0e-10, max_iter=1000)
+        scores = pagerank(graph, tol=1.0e-10, max_iter=1000).scores
+        if any(not close(scores[user], expected[user], 1.0e-6) for user in G):
+            return "PageRank differs"
+    return None
+
+
+def check_diameters(rng, count=3000):
+    """
+    Compare diameter and radius with NetworkX on many small, sparse graphs.
+
+    Bound-based algorithms tend to go wrong only on rare shapes (about one
+    sparse graph in five hundred for an early exit taken too soon), so this
+    check runs through thousands of them. Returns the failures found.
+
+    """
+    failures = 0
+    for trial in range(count):
+        num_users = rng.randint(10, 60)
+        if rng.random() < 0.5:
+            G = nx.gnm_random_graph(num_users, rng.randint(num_users, 2 * num_users), seed=rng.randrange(1 << 30))
+        else:
+            G = nx.connected_watts_strogatz_graph(num_users, 4, rng.random() / 4, seed=rng.randrange(1 << 30))
+        graph = AdjacencyMatrix(backend="csr")
+        for user in G:
+            graph.adduser(str(user))
+        for user1, user2 in G.edges:
+            graph.addconnection(str(user1), str(user2))
+        largest = max(len(component) for component in nx.connected_components(G))
+        candidates = [G.subgraph(component) for component in nx.connected_components(G) if len(component) == largest]
+        for name, found, reference in (("diameter", diameter(graph).value, nx.diameter),
+                                       ("radius", radius(graph).value, nx.radius)):
+            if found not in {reference(component) for component in candidates}:
+                failures += 1
+                print(Fore.RED + f"sparse graph {trial}: {name} {found} differs from NetworkX")
+    print(f"{'sparse':<8} {count} graphs checked for diameter and radius")
+    return failures
+
+
+def check_distances(graph, G, rng):
+    """Pruned landmark labels (also after a save/load round trip), k-hop neighbourhoods and the vectorized BFS."""
+    labeling = PrunedLandmarkLabeling(graph)
+    handle, path = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+    try:
+        labeling.save(path)
+        loaded = PrunedLandmarkLabeling.load(path)
+    finally:
+        os.remove(path)
+    lengths = dict(nx.all_pairs_shortest_path_length(G))
+    for user1 in G:
+        for user2 in G:
+            expected = lengths[user1].get(user2, float('inf'))
+            if labeling.distance(user1, user2) != expected or loaded.distance(user1, user2) != expected:
+                return f"labeling distance {user1} -> {user2} differs"
+    for user in G:
+        k = rng.randint(1, 4)
+        expected = sorted((other, hops) for other, hops in lengths[user].items() if 0 < hops <= k)
+        if sorted(graph.k_hop_neighbors(user, k)) != expected:
+            return f"{k}-hop neighbours of {user} differ"
+        if graph.k_hop_counts(user, k) != [sum(1 for _, hops in expected if hops == h) for h in range(1, k + 1)]:
+            return f"{k}-hop counts of {user} differ"
+        if np is not None and bfs_order(graph, user) != list(graph.iter_bfs(user)):
+            return f"vectorized BFS order from {user} differs"
+    return None
+
+
+def check_recommendations(graph, G, rng):
+    """Link-prediction scores against the NetworkX indices, one user at a time and for everyone at once."""
+    recommender = FriendRecommender(graph, people=[])
+    references = {
+        "common_neighbors": lambda pairs: ((u, v, len(list(nx.common_neighbors(G, u, v)))) for u, v in pairs),
+        "jaccard": lambda pairs: nx.jaccard_coefficient(G, pairs),
+        "adamic_adar": lambda pairs: nx.adamic_adar_index(G, pairs),
+        "resource_allocation": lambda pairs: nx.resource_allocation_index(G, pairs),
+    }
+    for metric in METRICS:
+        everyone = recommender.recommend_all(k=len(G), metric=metric, processes=1)
+        for user in G:
+            pairs = [(user, other) for other in G if other != user and not G.has_edge(user, other)]
+            # Only users sharing a friend with user are candidates
+            expected = {other: score for _, other, score in references[metric](pairs)
+                        if any(True for _ in nx.common_neighbors(G, user, other))}
+            for found in (dict(recommender.recommend(user, k=len(G), metric=metric)), dict(everyone[user])):
+                if found.keys() != expected.keys() or any(not close(found[other], expected[other]) for other in found):
+                    return f"{metric} suggestions for {user} differ"
+    return None
+
+
+def check_walk_index(graph, G, rng):
+    """Monte Carlo PageRank walks stay valid walks of the changing graph, and estimate personalized PageRank."""
+    index = MonteCarloPageRank(graph, walks_per_user=20, seed=rng.randrange(1 << 30))
+    try:
+        for _ in range(10):
+            # Keep the index up to date through changes of every kind
+            action = rng.random()
+            if action < 0.4 and len(G) > 1:
+                user1, user2 = rng.sample(list(G), 2)
+                graph.addconnection(user1, user2)
+                G.add_edge(user1, user2)
+            elif action < 0.7 and G.number_of_edges():
+                user1, user2 = rng.choice(list(G.edges))
+                graph.removeconnection(user1, user2)
+                G.remove_edge(user1, user2)
+            elif action < 0.85 and G:
+                user = rng.choice(list(G))
+                graph.removeuser(user)
+                G.remove_node(user)
+            else:
+                name = f"new{rng.randrange(1 << 30)}"
+                graph.adduser(name)
+                G.add_node(name)
+        for index_of_user, name in enumerate(graph.names):
+            walks = index.segments[index_of_user]
+            if name is None:
+                continue
+            if len(walks) != index.walks_per_user:
+                return f"{name} has {len(walks)} stored walks"
+            for path in walks:
+                if path[0] != index_of_user or any(not G.has_edge(graph.names[a], graph.names[b])
+                                                   for a, b in zip(path, path[1:])):
+                    return f"a stored walk of {name} is not a walk of the current graph"
+        if G.number_of_edges():
+            user = max(G, key=G.degree)
+            expected = nx.pagerank(G, alpha=1 - index.reset_probability, personalization={user: 1},
+                                   dangling={user: 1}, tol=1.0e-10, max_iter=1000)
+            found = index.ppr(user, num_episodes=20000)
+            error = sum(abs(found.get(other, 0) - expected[other]) for other in G)
+            if error > 0.1:
+                return f"personalized PageRank of {user} is {error:.3f} away in total"
+    finally:
+        index.close()
+    return None
+
+
+def check_communities(graph, G, rng):
+    """Louvain and label propagation give partitions of every user with the modularity NetworkX computes."""
+    runs = [("louvain", louvain(graph, seed=rng.randrange(1 << 30))),
+            ("label propagation", label_propagation(graph, seed=rng.randrange(1 << 30)))]
+    if np is not None:
+        runs.append(("vectorized label propagation", label_propagation(graph, seed=rng.randrange(1 << 30), vectorized=True)))
+    for name, result in runs:
+        if set(result.communities) != set(G):
+            return f"{name} does not place every user"
+        groups = {}
+        for user, community in result.communities.items():
+            groups.setdefault(community, set()).add(user)
+        expected = nx.community.modularity(G, groups.values()) if G.number_of_edges() else 0.0
+        if not close(result.modularity, expected) or not close(modularity(graph, result.communities), expected):
+            return f"{name} modularity differs"
+        if name == "louvain" and result.modularity < -1.0e-9:
+            return "louvain does worse than leaving every user alone"
+    return None
+
+
+def check_hyperanf(graph, G, rng):
+    """HyperANF ball sizes averaged over a few hash seeds stay close to the exact neighbourhood function."""
+    if np is None or not G:
+        return None
+    # One seed can put two users in the same register, which undercounts every ball that holds
+    # both; the error is unbiased over seeds, so the check averages a few runs
+    runs = [hyperanf(graph, precision=12, seed=rng.randrange(1 << 30)).neighborhood for _ in range(4)]
+    exact = [0]
+    for _, lengths in nx.all_pairs_shortest_path_length(G):
+        for hops in lengths.values():
+            exact.extend([0] * (hops + 1 - len(exact)))
+            exact[hops] += 1
+    cumulative = [sum(exact[:hops + 1]) for hops in range(len(exact))]
+    for hops, pairs in enumerate(cumulative):
+        estimate = sum(run[min(hops, len(run) - 1)] for run in runs) / len(runs)
+        if abs(estimate - pairs) > 0.1 * pairs:
+            return f"HyperANF estimates {estimate:.0f} pairs within {hops} hops instead of {pairs}"
+    return None
+
+
+CHECKS = (check_structure, check_triangles, check_cores, check_paths, check_eccentricities, check_centrality,
+          check_distances, check_recommendations, check_walk_index, check_communities, check_hyperanf)
+
+
+def main(trials=100, seed=0):
+    """Compare every check against NetworkX on random graphs for each backend; return the number of failures."""
+    rng = random.Random(seed)
+    failures = 0
+    for backend in available_backends():
+        for trial in range(trials):
+            for check in CHECKS:
+                graph, G = random_graphs(rng, backend)
+                problem = check(graph, G, rng)
+                if problem is not None:
+                    failures += 1
+                    print(Fore.RED + f"{backend} trial {trial}, {check.__doc__.rstrip('.')}: {problem}")
+        for check in CHECKS:
+            for graph, G in edgeless_graphs(backend):
+                problem = check(graph, G, rng)
+                if problem is not None:
+                    failures += 1
+                    print(Fore.RED + f"{backend} edgeless graph of {len(G)} users, {check.__doc__.rstrip('.')}: {problem}")
+        print(f"{backend:<8} {trials} random graphs and the edgeless graphs checked against NetworkX")
+    failures += check_diameters(rng)
+    if failures == 0:
+        print(Fore.GREEN + "All results match NetworkX.")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
@@ -0,0 +1,277 @@
+import heapq  # For the priority queue used by the A* search
+import json  # For saving and loading a built labeling
+import time  # For recording how long an index took to build
+from array import array  # For compact per-landmark distance tables
+from collections import deque  # For the BFS queue
+
+
+def bfs_distances(graph, source):
+    """Return an array of hop distances from source to every index of graph (-1 = unreachable)."""
+    distances = array('i', [-1]) * len(graph.names)
+    distances[source] = 0
+    queue = deque([source])
+    while queue:
+        index = queue.popleft()
+        next_distance = distances[index] + 1
+        for neighbor_index in graph.neighbor_indices(index):
+            if distances[neighbor_index] < 0:
+                distances[neighbor_index] = next_distance
+                queue.append(neighbor_index)
+    return distances
+
+
+class LandmarkIndex:
+    """
+    Landmark (ALT) distance oracle over an AdjacencyMatrix.
+
+    BFS distances from a few high-degree landmark users are precomputed.
+    By the triangle inequality they give instant lower and upper bounds on
+    the degrees of separation between any two users, and the lower bound
+    guides an A* search for an exact shortest path.
+
+    The tables are keyed by storage index, so they only describe the graph
+    as it was when build() ran. Rebuilding reruns every landmark BFS, so
+    queries never do it: while is_stale() reports a change, shortest_path()
+    falls back to AdjacencyMatrix.shortest_path and bounds() returns None.
+    Call refresh() when the index should catch up, e.g. periodically.
+
+    """
+
+    def __init__(self, graph, num_landmarks=16):
+        self.graph = graph
+        self.num_landmarks = num_landmarks
+        self.landmarks = []  # Indices of the landmark users
+        self.distances = []  # One distance array per landmark
+        self.version = None  # Graph version the index was built from
+        self.build_seconds = 0.0
+        self.build()
+
+    def build(self):
+        """(Re)compute the landmark distance tables from the current graph."""
+        start = time.perf_counter()
+        graph = self.graph
+        live = [index for index, name in enumerate(graph.names) if name is not None]
+        # The best-connected users sit on the most shortest paths
+        self.landmarks = heapq.nlargest(self.num_landmarks, live, key=lambda index: graph.degree_counts[index])
+        self.distances = [bfs_distances(graph, landmark) for landmark in self.landmarks]
+        self.version = graph.version
+        self.build_seconds = time.perf_counter() - start
+
+    def is_stale(self):
+        """Return True if the graph has changed since the index was built."""
+        return self.version != self.graph.version
+
+    def refresh(self):
+        """Rebuild the tables if the graph changed, so they match its current indices."""
+        if self.is_stale():
+            self.build()
+
+    def memory_bytes(self):
+        """Return the size of the distance tables in bytes."""
+        return sum(len(table) * table.itemsize for table in self.distances)
+
+    def _index_bounds(self, idx1, idx2):
+        """Return (lower, upper) bounds on the hop distance between two indices."""
+        lower, upper = 0, float('inf')
+        for table in self.distances:
+            d1, d2 = table[idx1], table[idx2]
+            if d1 < 0 and d2 < 0:
+                continue  # This landmark lies in another component and says nothing
+            if d1 < 0 or d2 < 0:
+                return float('inf'), float('inf')  # One user reaches the landmark and the other cannot
+            lower = max(lower, abs(d1 - d2))
+            upper = min(upper, d1 + d2)
+        return lower, upper
+
+    def bounds(self, user1, user2):
+        """
+        Return (lower, upper) bounds on the degrees of separation between two users.
+
+        Both bounds are float('inf') when the landmarks prove the users are not
+        connected; upper is float('inf') when no landmark reaches either user.
+        Returns None if either user is unknown or the index is stale.
+
+        """
+        if user1 not in self.graph.users or user2 not in self.graph.users or self.is_stale():
+            return None
+        return self._index_bounds(self.graph.users[user1], self.graph.users[user2])
+
+    def shortest_path(self, start_user, end_user):
+        """
+        Find a shortest chain of friendships with A*, guided by the landmark lower bounds.
+
+        Returns (path, hops) like AdjacencyMatrix.shortest_path, or None if either
+        user is unknown or they are not connected. While the index is stale the
+        bidirectional BFS of the graph answers instead.
+
+        """
+        graph = self.graph
+        if start_user not in graph.users or end_user not in graph.users:
+            return None
+        if self.is_stale():
+            return graph.shortest_path(start_user, end_user)
+        start, end = graph.users[start_user], graph.users[end_user]
+        # Only landmarks that reach the target can bound the remaining distance
+        targets = [(table, table[end]) for table in self.distances if table[end] >= 0]
+        if any(table[start] < 0 for table, _ in targets):
+            return None  # A landmark reaches the target but not the start
+
+        def estimate(index):
+            """Lower bound on the hops still needed from index to the target."""
+            return max((abs(table[index] - target) for table, target in targets), default=0)
+
+        best = {start: 0}  # Fewest hops found so far to each index
+        parents = {start: None}
+        queue = [(estimate(start), 0, start)]
+        while queue:
+            _, hops, index = heapq.heappop(queue)
+            if index == end:
+                path = []
+                while index is not None:
+                    path.append(graph.names[index])
+                    index = parents[index]
+                path.reverse()
+                return path, hops
+            if hops > best[index]:
+                continue  # A shorter route to this user was already expanded
+            for neighbor_index in graph.neighbor_indices(index):
+                if hops + 1 < best.get(neighbor_index, float('inf')):
+                    best[neighbor_index] = hops + 1
+                    parents[neighbor_index] = index
+                    heapq.heappush(queue, (hops + 1 + estimate(neighbor_index), hops + 1, neighbor_index))
+        return None
+
+
+class PrunedLandmarkLabeling:
+    """
+    Exact 2-hop distance labels (pruned landmark labeling) for an AdjacencyMatrix.
+
+    Every user gets a label: a list of (hub rank, distance) pairs sorted by
+    rank. Users are processed from highest to lowest degree and each one
+    runs a BFS that is pruned wherever the labels built so far already
+    give the right distance, so labels stay small. The distance between
+    two users is the minimum of d(a, hub) + d(hub, b) over the hubs their
+    labels share, found by merging the two sorted lists.
+
+    The labels are keyed by user name, so a labeling built offline can be
+    saved and loaded again at startup without the graph.
+
+    """
+
+    def __init__(self, graph=None):
+        self.names = []  # User name of each labelled vertex
+        self.position = {}  # User name -> labelled vertex
+        self.label_ranks = []  # Per vertex: hub ranks in ascending order
+        self.label_distances = []  # Per vertex: distance to the hub at the same position
+        self.version = None  # Graph version the labels were built from
+        self.build_seconds = 0.0
+        if graph is not None:
+            self.build(graph)
+
+    def build(self, graph):
+        """Compute the labels for every user of graph."""
+        start = time.perf_counter()
+        live = [index for index, name in enumerate(graph.names) if name is not None]
+        # Label against the best-connected users first; they cover the most shortest paths
+        order = sorted(live, key=lambda index: -graph.degree_counts[index])
+        vertex_of = {index: vertex for vertex, index in enumerate(order)}
+        neighbors = [[vertex_of[j] for j in graph.neighbor_indices(index)] for index in order]
+
+        count = len(order)
+        ranks = [array('i') for _ in range(count)]
+        distances = [array('i') for _ in range(count)]
+        root_distance = [-1] * count  # Distances in the current root's label, indexed by hub rank
+        seen = [-1] * count  # BFS distance from the current root (-1 = not reached yet)
+
+        # Vertex numbers are the processing order, so a vertex's rank is its own number
+        for root in range(count):
+            for hub, distance in zip(ranks[root], distances[root]):
+                root_distance[hub] = distance
+            visited = [root]
+            seen[root] = 0
+            queue = deque([root])
+            while queue:
+                vertex = queue.popleft()
+                distance = seen[vertex]
+                # Prune if an earlier hub already proves a path this short
+                pruned = False
+                for hub, hub_distance in zip(ranks[vertex], distances[vertex]):
+                    through_hub = root_distance[hub]
+                    if through_hub >= 0 and through_hub + hub_distance <= distance:
+                        pruned = True
+                        break
+                if pruned:
+                    continue
+                ranks[vertex].append(root)
+                distances[vertex].append(distance)
+                for neighbor in neighbors[vertex]:
+                    if seen[neighbor] < 0:
+                        seen[neighbor] = distance + 1
+                        visited.append(neighbor)
+                        queue.append(neighbor)
+            # Reset the scratch arrays for the next root
+            for vertex in visited:
+                seen[vertex] = -1
+            for hub in ranks[root]:
+                root_distance[hub] = -1
+
+        self.names = [graph.names[index] for index in order]
+        self.position = {name: vertex for vertex, name in enumerate(self.names)}
+        self.label_ranks = ranks
+        self.label_distances = distances
+        self.version = graph.version
+        self.build_seconds = time.perf_counter() - start
+
+    def average_label_size(self):
+        """Return the average number of hubs per label."""
+        return sum(len(label) for label in self.label_ranks) / len(self.label_ranks) if self.label_ranks else 0
+
+    def distance(self, user1, user2):
+        """
+        Return the exact number of hops between two users.
+
+        Returns float('inf') if they are not connected, or None if either user is unknown.
+
+        """
+        if user1 not in self.position or user2 not in self.position:
+            return None
+        vertex1, vertex2 = self.position[user1], self.position[user2]
+        ranks1, distances1 = self.label_ranks[vertex1], self.label_distances[vertex1]
+        ranks2, distances2 = self.label_ranks[vertex2], self.label_distances[vertex2]
+        best = float('inf')
+        i = j = 0
+        # Merge the two rank-sorted labels, combining the distances of every shared hub
+        while i < len(ranks1) and j < len(ranks2):
+            if ranks1[i] == ranks2[j]:
+                best = min(best, distances1[i] + distances2[j])
+                i += 1
+                j += 1
+            elif ranks1[i] < ranks2[j]:
+                i += 1
+            else:
+                j += 1
+        return best
+
+    def save(self, path):
+        """Write the labels to a JSON file."""
+        data = {
+            "version": self.version,
+            "names": self.names,
+            "label_ranks": [label.tolist() for label in self.label_ranks],
+            "label_distances": [label.tolist() for label in self.label_distances],
+        }
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+
+    @classmethod
+    def load(cls, path):
+        """Read labels written by save()."""
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        labeling = cls()
+        labeling.version = data["version"]
+        labeling.names = data["names"]
+        labeling.position = {name: vertex for vertex, name in enumerate(labeling.names)}
+        labeling.label_ranks = [array('i', label) for label in data["label_ranks"]]
+        labeling.label_distances = [array('i', label) for label in data["label_distances"]]
+        return labeling
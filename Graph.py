@@ -3,33 +3,68 @@ import matplotlib.pyplot as plt  # For creating static, animated, and interactiv
 from colorama import Fore, Style, init  # For format text output in the console with colors.
 import os  # For interacting with the operating system, such as clearing the console screen.
 import heapq  # For the priority queue implementation
+from collections import deque  # For O(1) queue operations in breadth-first traversals
+from Storage import create_storage, np  # For the pluggable adjacency storage backends (np is None without NumPy)
+from Snapshot import GraphSnapshot  # For read-only array copies used by the analytics
 
 
 # Initialize colorama
 init(autoreset=True)
 # Automatically resets the color and style after each print statement, so you don't need to manually reset styles.
+
+# Graphs with at least this many users take a fresh snapshot for the vectorized BFS;
+# smaller ones only use it while a current snapshot is already cached
+VECTORIZED_BFS_MIN_USERS = 100000
+
+
 class AdjacencyMatrix:
 
-    def __init__(self):
+    def __init__(self, backend="dense", compact_threshold=0.5, track_triangles=False):
         self.users = {}  # Dictionary to store user indices
-        self.graph = []  # Adjacency matrix
+        self.names = []  # List mapping each index back to its user name (None for a removed user)
+        self.graph = create_storage(backend)  # Adjacency storage backend ("dense", "csr", "bitset" or "numpy")
+        self.backend = backend  # Name of the storage backend, reused for derived graphs such as k_core
         self.num_users = 0  # Number of users
+        self.version = 0  # Incremented on every change, so derived indexes can tell they are stale
+        self.num_connections = 0  # Number of connections (friendships)
+        self.degree_counts = []  # Number of friends of the user at each index
+        self.free_indices = []  # Indices of removed users, reused by adduser
+        self.compact_threshold = compact_threshold  # Compact once this fraction of slots is free (None = never)
+        self.triangles = [] if track_triangles else None  # Triangles through each index, kept live when tracking
+        self.num_triangles = 0  # Total number of triangles (only maintained when tracking)
+        self._parent = []  # Union-find parent of each index (connected components)
+        self._rank = []  # Union-find rank (upper bound on tree height) of each root
+        self._size = []  # Number of users in the component of each root
+        self._components_dirty = False  # Set when a removal may have split a component
+        self.listeners = []  # Objects notified of every change (see add_listener)
+        self._snapshot = None  # Last snapshot taken, reused until the graph changes
 
     def adduser(self, user_name):
         """Add a new user to the graph."""
         if user_name not in self.users:
             # If the user does not already exist, add them to the users dictionary
-            self.users[user_name] = self.num_users  # Map user name to a unique index
+            if self.free_indices:
+                # Reuse the (already empty) slot of a removed user
+                index = self.free_indices.pop()
+                self.names[index] = user_name
+                # The slot is already a singleton after the rebuild that followed its removal
+                self._parent[index] = index
+                self._rank[index] = 0
+                self._size[index] = 1
+            else:
+                index = self.graph.add_node()  # Allocate a new slot in the storage
+                self.names.append(user_name)  # Keep the index -> name lookup in step
+                self.degree_counts.append(0)  # A new user starts without friends
+                if self.triangles is not None:
+                    self.triangles.append(0)
+                self._parent.append(index)  # A new user is a component of their own
+                self._rank.append(0)
+                self._size.append(1)
+            self.users[user_name] = index  # Map user name to its index
             self.num_users += 1  # Increment the total number of users
-
-            # Extend the graph by adding a new column for the new user in each existing row
-            for row in self.graph:
-                row.append(float('inf'))  # Using float('inf') is often useful in algorithms,
-                # particularly those involving optimization or graph-related algorithms,
-                #  such as Dijkstra's algorithm for shortest paths
-            
-            # Append a new row for the new user initialized to zero 
-            self.graph.append([float('inf')] * self.num_users)
+            self.version += 1
+            for listener in self.listeners:
+                listener.on_user_added(index)
             return True  # Indicate success in adding the user
         else:
             # Notify if the user already exists
@@ -39,12 +74,26 @@ class AdjacencyMatrix:
     def addconnection(self, user1, user2):
         """Add a connection (friendship) between two users."""
         if user1 in self.users and user2 in self.users:
+            if user1 == user2:
+                # A friendship needs two different users
+                print(f"{Fore.RED}User {user1} cannot be connected to themselves.")
+                return
             # Get the index of each user
             idx1 = self.users[user1]
             idx2 = self.users[user2]
-            # Update the adjacency matrix to indicate a connection between the two users
-            self.graph[idx1][idx2] = 1  # Set the connection for user1 to user2
-            self.graph[idx2][idx1] = 1  # Set the connection for user2 to user1 
+            # Store the connection in both directions
+            if self.graph.add_edge(idx1, idx2):
+                # Only a new connection changes the counters
+                self.degree_counts[idx1] += 1
+                self.degree_counts[idx2] += 1
+                self.num_connections += 1
+                self.version += 1
+                if self.triangles is not None:
+                    self._update_triangles(idx1, idx2, 1)  # Every mutual friend closes a new triangle
+                if not self._components_dirty:
+                    self._union(idx1, idx2)  # Merge the two components (a pending rebuild will see the edge anyway)
+                for listener in self.listeners:
+                    listener.on_connection_added(idx1, idx2)
         else:
             # Notify if either user is not found
             print(f"{Fore.RED}Users {user1} and/or {user2} not found.")
@@ -55,9 +104,18 @@ class AdjacencyMatrix:
             # Get the index of each user
             idx1 = self.users[user1]
             idx2 = self.users[user2]
-            # Update the adjacency matrix to remove the connection between the two users
-            self.graph[idx1][idx2] = 0  # Remove the connection for user1 to user2
-            self.graph[idx2][idx1] = 0  # Remove the connection for user2 to user1
+            # Remove the connection in both directions
+            if self.graph.remove_edge(idx1, idx2):
+                # Only an existing connection changes the counters
+                self.degree_counts[idx1] -= 1
+                self.degree_counts[idx2] -= 1
+                self.num_connections -= 1
+                self.version += 1
+                if self.triangles is not None:
+                    self._update_triangles(idx1, idx2, -1)  # Every mutual friend loses a triangle
+                self._components_dirty = True  # The component may have split; rebuild lazily
+                for listener in self.listeners:
+                    listener.on_connection_removed(idx1, idx2)
         else:
             # Notify if either user is not found
             print(f"{Fore.RED}Users {user1} and/or {user2} not found.")
@@ -67,22 +125,122 @@ class AdjacencyMatrix:
         if user in self.users:
             index = self.users[user]  # Get the index of the user to be removed
             del self.users[user]  # Remove the user from the users dictionary
-            del self.graph[index]  # Remove the user's row from the adjacency matrix
-
-            # Remove the user's column from each row in the adjacency matrix
-            for row in self.graph:
-                del row[index]
+            friends = list(self.graph.neighbors(index))  # Remembered for the listeners
+            for neighbor_index in friends:
+                self.degree_counts[neighbor_index] -= 1  # Each friend loses one friend
+            self.num_connections -= self.degree_counts[index]
+            self.degree_counts[index] = 0
+            if self.triangles is not None:
+                # A friend loses one triangle for every mutual friend they share with the removed user
+                for neighbor_index in self.graph.neighbors(index):
+                    self.triangles[neighbor_index] -= self.graph.common_neighbor_count(index, neighbor_index)
+                self.num_triangles -= self.triangles[index]
+                self.triangles[index] = 0
+            self.graph.clear_node(index)  # Remove the user's connections, keeping the slot
+            self.names[index] = None  # Tombstone the slot; other users keep their indices
+            self.free_indices.append(index)  # Make the slot available for the next new user
+            self._components_dirty = True  # The user's component may have split; rebuild lazily
             
             self.num_users -= 1  # Decrease the total number of users
+            self.version += 1
+            for listener in self.listeners:
+                for neighbor_index in friends:
+                    listener.on_connection_removed(index, neighbor_index)
+                listener.on_user_removed(index)
+
+            # Reclaim the tombstoned slots once too many of them pile up
+            if self.compact_threshold is not None and len(self.free_indices) > self.compact_threshold * len(self.names):
+                self.compact()
+
+    def compact(self):
+        """Drop the slots of removed users, renumbering the remaining users to 0 .. num_users - 1."""
+        keep = [index for index, name in enumerate(self.names) if name is not None]
+        self.graph.renumber(keep)  # Rebuild the storage without the tombstoned slots
+        self.names = [self.names[index] for index in keep]
+        self.degree_counts = [self.degree_counts[index] for index in keep]
+        if self.triangles is not None:
+            self.triangles = [self.triangles[index] for index in keep]
+        self.users = {name: index for index, name in enumerate(self.names)}
+        self.free_indices = []
+        self.version += 1  # Indices changed
+        self._rebuild_components()  # Indices changed, so the union-find is rebuilt for the new numbering
+        for listener in self.listeners:
+            listener.on_compact(keep)
+
+    def add_listener(self, listener):
+        """
+        Register an object to be told about every change to the graph.
+
+        The listener must provide on_user_added(index), on_user_removed(index),
+        on_connection_added(idx1, idx2), on_connection_removed(idx1, idx2) and
+        on_compact(keep), where keep lists the old indices in their new order.
+        Each call is made after the graph itself has been updated.
+
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Stop notifying a listener registered with add_listener."""
+        self.listeners.remove(listener)
+
+    def snapshot(self):
+        """Return a read-only GraphSnapshot (compact CSR arrays) of the current users and connections."""
+        # Snapshots are read-only, so one can be shared until the next change
+        if self._snapshot is None or self._snapshot.version != self.version:
+            self._snapshot = GraphSnapshot.from_graph(self)
+        return self._snapshot
+
+    def has_connection(self, user1, user2):
+        """Return True if the two users are connected."""
+        if user1 in self.users and user2 in self.users:
+            return self.graph.has_edge(self.users[user1], self.users[user2])
+        return False
 
-            # Update the user indices for users that came after the removed user
-            for key, value in self.users.items():
-                if value > index:
-                    self.users[key] = value - 1  # Decrement their index by one
+    def mutual_friends(self, user1, user2):
+        """Return the names of the friends that two users have in common."""
+        if user1 not in self.users or user2 not in self.users:
+            print(f"{Fore.RED}Users {user1} and/or {user2} not found.")
+            return []
+        shared = self.graph.common_neighbors(self.users[user1], self.users[user2])
+        return [self.names[j] for j in shared]
+
+    def mutual_friend_count(self, user1, user2):
+        """Return how many friends two users have in common."""
+        if user1 not in self.users or user2 not in self.users:
+            print(f"{Fore.RED}Users {user1} and/or {user2} not found.")
+            return 0
+        return self.graph.common_neighbor_count(self.users[user1], self.users[user2])
+
+    def degree(self, user):
+        """Return the number of friends of the given user."""
+        if user not in self.users:
+            print(f"{Fore.RED}User {user} not found.")
+            return 0
+        return self.degree_counts[self.users[user]]
+
+    def degrees(self):
+        """Return a dictionary mapping every user to their number of friends."""
+        return {user: degree for user, degree in zip(self.names, self.degree_counts) if user is not None}
 
     def get_all_users(self):
         """Return a list of all user names."""
         return list(self.users.keys())  # Return the keys from the users dictionary
+
+    def neighbor_indices(self, index):
+        """Iterate over the indices of the users connected to the user at the given index."""
+        return iter(self.graph.neighbors(index))
+
+    def neighbor_index_list(self, index):
+        """Return the indices of the users connected to the user at the given index, as a list to pick from."""
+        return list(self.graph.neighbors(index))
+
+    def neighbors(self, user):
+        """Iterate over the names of the users connected to the given user."""
+        if user not in self.users:
+            print(f"{Fore.RED}User {user} not found.")
+            return iter(())
+        names = self.names  # Local lookup for the generator below
+        return (names[j] for j in self.graph.neighbors(self.users[user]))
     
     def displayGraph(self):
         """Display the adjacency matrix of the graph with colors and formatting."""
@@ -102,11 +260,10 @@ class AdjacencyMatrix:
         # Print each user's connections
         for i, user in enumerate(users):
             row_display = Fore.BLUE + f"{user:<{max_user_length}} | "  # User name in blue
-            for j in range(len(users)):
+            for other in users:
                 # Check for a valid connection
-                value = self.graph[i][j]
-                if value < float('inf'):  # There's a connection
-                    row_display += Fore.GREEN + f"{value:>{max_user_length}}"  # Connection weight (1 or other weight)
+                if self.graph.has_edge(self.users[user], self.users[other]):  # There's a connection
+                    row_display += Fore.GREEN + f"{1:>{max_user_length}}"  # Connection weight
                 else:  # No connection
                     row_display += Fore.RED + f"{0:>{max_user_length}}"  # No connection (0)
             
@@ -144,110 +301,347 @@ class AdjacencyMatrix:
             if current_distance > distances[current_user]:
                 continue
             
-            # Check all neighbors of the current user
-            for neighbor_index in range(self.num_users):
-                weight = self.graph[self.users[current_user]][neighbor_index]
-                if weight < float('inf'):  # Check if there is a valid edge
-                    neighbor = self.get_all_users()[neighbor_index]
-                    distance = current_distance + weight
-                    
-                    # If found a shorter path to the neighbor
-                    if distance < distances[neighbor]:
-                        distances[neighbor] = distance
-                        predecessors[neighbor] = current_user
-                        heapq.heappush(queue, (distance, neighbor))  # Add neighbor to the priority queue
+            # Check all neighbors of the current user (every connection has weight 1)
+            for neighbor in self.neighbors(current_user):
+                distance = current_distance + 1
+                
+                # If found a shorter path to the neighbor
+                if distance < distances[neighbor]:
+                    distances[neighbor] = distance
+                    predecessors[neighbor] = current_user
+                    heapq.heappush(queue, (distance, neighbor))  # Add neighbor to the priority queue
 
         print(f"{Fore.RED}No path found from {start_user} to {end_user}.")
 
-    def bfs(self, start_user):
-        """Perform a Breadth-First Search (BFS) starting from the given user."""
-        visited = set()  # Set to keep track of visited users
-        queue = [start_user]  # Initialize the queue with the starting user
-        
+    def shortest_path(self, start_user, end_user):
+        """
+        Find a shortest chain of friendships between two users with a bidirectional BFS.
+
+        Returns (path, hops) where path is the list of user names from start_user
+        to end_user, or None if either user is unknown or they are not connected.
+
+        """
+        if start_user not in self.users or end_user not in self.users:
+            return None
+        start, end = self.users[start_user], self.users[end_user]
+        if start == end:
+            return [start_user], 0
+        # Ask the union-find only while it is current; after a removal, rebuilding it would
+        # cost a full pass over the graph, and the search below finds unreachable users anyway
+        if not self._components_dirty and self._find(start) != self._find(end):
+            return None  # The union-find already knows there is no path
+
+        # Parent pointers for each side double as their visited sets
+        forward_parents = {start: None}
+        backward_parents = {end: None}
+        forward_frontier = [start]
+        backward_frontier = [end]
+        meeting = None
+
+        while meeting is None:
+            # Always expand the smaller frontier, so the search stays close to the meeting point
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, parents, other_parents = forward_frontier, forward_parents, backward_parents
+            else:
+                frontier, parents, other_parents = backward_frontier, backward_parents, forward_parents
+            if not frontier:
+                return None  # One side ran out of users to visit
+            next_frontier = []
+            for index in frontier:
+                for neighbor_index in self.neighbor_indices(index):
+                    if neighbor_index in parents:
+                        continue
+                    parents[neighbor_index] = index
+                    if neighbor_index in other_parents:
+                        meeting = neighbor_index  # Both searches reached this user at the same level
+                        break
+                    next_frontier.append(neighbor_index)
+                if meeting is not None:
+                    break
+            if frontier is forward_frontier:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+
+        # Walk back to the start, then forward to the end
+        path = []
+        index = meeting
+        while index is not None:
+            path.append(self.names[index])
+            index = forward_parents[index]
+        path.reverse()
+        index = backward_parents[meeting]
+        while index is not None:
+            path.append(self.names[index])
+            index = backward_parents[index]
+        return path, len(path) - 1
+
+    def iter_bfs(self, start_user, max_depth=None, max_nodes=None, stop=None):
+        """
+        Lazily walk the graph breadth-first from start_user.
+
+        Yields (user, depth, parent) tuples, parent being None for start_user.
+        Users further than max_depth hops are not visited, at most max_nodes
+        users are yielded, and the walk ends right after the first user for
+        which stop(user, depth) returns True.
+
+        """
         if start_user not in self.users:
             # Notify if the starting user is not found
             print(f"{Fore.RED}User {start_user} not found.")
             return
         
         start_index = self.users[start_user]  # Get the index of the starting user
-        visited.add(start_user)  # Mark the starting user as visited
-        print(Fore.GREEN + "BFS traversal starting from", start_user + ":")
-        print(start_user, end=' ')  # Print the starting user
+        visited = {start_index}  # Set to keep track of visited indices
+        queue = deque([(start_index, 0, None)])  # (index, depth, parent index); popleft is O(1)
+        yielded = 0  # Number of users produced so far
+        if max_nodes is not None and max_nodes < 1:
+            return  # Not even the start user may be yielded
         
         while queue:
-            user = queue.pop(0)  # Dequeue a user from the front of the queue
-            index = self.users[user]  # Get the index of the user
+            index, depth, parent = queue.popleft()  # Dequeue a user from the front of the queue
+            user = self.names[index]
+            yield user, depth, None if parent is None else self.names[parent]
+            yielded += 1
+            if (max_nodes is not None and yielded >= max_nodes) or (stop is not None and stop(user, depth)):
+                return  # The caller has seen enough
+            if max_depth is not None and depth >= max_depth:
+                continue  # Do not look past the depth limit
             
-            # Check all possible connections from the current user
-            for neighbor_index in range(self.num_users):
-                # If a connection exists and the neighbor hasn't been visited
-                if self.graph[index][neighbor_index] == 1 and self.get_all_users()[neighbor_index] not in visited:
-                    neighbor = self.get_all_users()[neighbor_index]  # Get the neighbor's name
-                    queue.append(neighbor)  # Enqueue the neighbor
-                    visited.add(neighbor)  # Mark the neighbor as visited
-                    print(neighbor, end=' ')  # Print the neighbor
-
-    def dfs(self, start_user):
-        """Perform a Depth-First Search (DFS) starting from the given user."""
-        visited = set()  # Set to keep track of visited users
-        stack = [start_user]  # Initialize the stack with the starting user
-        
+            # Check the connections of the current user
+            for neighbor_index in self.neighbor_indices(index):
+                # If the neighbor hasn't been visited
+                if neighbor_index not in visited:
+                    visited.add(neighbor_index)  # Mark the neighbor as visited
+                    queue.append((neighbor_index, depth + 1, index))  # Enqueue the neighbor
+
+    def iter_dfs(self, start_user, max_depth=None, max_nodes=None, stop=None):
+        """
+        Lazily walk the graph depth-first from start_user.
+
+        Yields (user, depth, parent) tuples in pre-order, depth being the depth
+        in the DFS tree. max_nodes and stop work as in iter_bfs, but max_depth
+        limits the depth in the DFS tree, not the number of hops: a user within
+        max_depth hops is skipped if the walk first reaches them along a longer
+        route (use iter_bfs for everyone within max_depth hops).
+
+        """
         if start_user not in self.users:
             # Notify if the starting user is not found
             print(f"{Fore.RED}User {start_user} not found.")
             return
         
-        start_index = self.users[start_user]  # Get the index of the starting user
-        visited.add(start_user)  # Mark the starting user as visited
-        print(Fore.GREEN + "DFS traversal starting from", start_user + ":")
-        print(start_user, end=' ')  # Print the starting user
+        visited = set()  # Set to keep track of visited indices
+        stack = [(self.users[start_user], 0, None)]  # (index, depth, parent index)
+        yielded = 0  # Number of users produced so far
+        if max_nodes is not None and max_nodes < 1:
+            return  # Not even the start user may be yielded
         
         while stack:
-            user = stack.pop()  # Pop a user from the stack
-            index = self.users[user]  # Get the index of the user
+            index, depth, parent = stack.pop()  # Pop a user from the stack
+            if index in visited:
+                continue  # Already reached through another path
+            visited.add(index)  # Mark the user as visited
+            user = self.names[index]
+            yield user, depth, None if parent is None else self.names[parent]
+            yielded += 1
+            if (max_nodes is not None and yielded >= max_nodes) or (stop is not None and stop(user, depth)):
+                return  # The caller has seen enough
+            if max_depth is not None and depth >= max_depth:
+                continue  # Do not look past the depth limit
             
-            # Check all possible connections from the current user
-            for neighbor_index in range(self.num_users):
-                # If a connection exists and the neighbor hasn't been visited
-                if self.graph[index][neighbor_index] == 1 and self.get_all_users()[neighbor_index] not in visited:
-                    neighbor = self.get_all_users()[neighbor_index]  # Get the neighbor's name
-                    stack.append(neighbor)  # Add the neighbor to the stack
-                    visited.add(neighbor)  # Mark the neighbor as visited
-                    print(neighbor, end=' ')  # Print the neighbor
-
-    def connected_components(self):
-        """Find and return all connected components in the graph."""
-        visited = set()  # Set to keep track of visited users
-        components = []  # List to hold all connected components
+            # Push unvisited neighbors in reverse so the lowest index is explored first
+            for neighbor_index in reversed(list(self.neighbor_indices(index))):
+                if neighbor_index not in visited:
+                    stack.append((neighbor_index, depth + 1, index))
+
+    def _k_hop_levels(self, index, k, neighbor_sets):
+        """Return the sets of indices exactly 1, 2, ... k hops from index (stopping early when none are left)."""
+        seen = {index}
+        frontier = {index}
+        levels = []
+        for _ in range(k):
+            next_frontier = set()
+            for current in frontier:
+                neighbors = neighbor_sets.get(current)
+                if neighbors is None:
+                    # Shared across the sources of a batch, so each row is read from storage once
+                    neighbors = neighbor_sets[current] = frozenset(self.graph.neighbors(current))
+                next_frontier |= neighbors
+            next_frontier -= seen  # Keep only users reached for the first time
+            if not next_frontier:
+                break
+            seen |= next_frontier
+            levels.append(next_frontier)
+            frontier = next_frontier
+        return levels
+
+    def k_hop_neighbors_many(self, users, k):
+        """Return a dictionary mapping each user to their [(user, hop), ...] list within k hops, sorted by hop."""
+        neighbor_sets = {}  # Neighbour rows reused by every source in the batch
+        results = {}
+        for user in users:
+            if user not in self.users:
+                print(f"{Fore.RED}User {user} not found.")
+                continue
+            levels = self._k_hop_levels(self.users[user], k, neighbor_sets)
+            results[user] = [(name, hop)
+                             for hop, level in enumerate(levels, 1)
+                             for name in sorted(self.names[index] for index in level)]
+        return results
+
+    def k_hop_counts_many(self, users, k):
+        """Return a dictionary mapping each user to the number of users at 1, 2, ... k hops."""
+        neighbor_sets = {}  # Neighbour rows reused by every source in the batch
+        results = {}
+        for user in users:
+            if user not in self.users:
+                print(f"{Fore.RED}User {user} not found.")
+                continue
+            levels = self._k_hop_levels(self.users[user], k, neighbor_sets)
+            counts = [len(level) for level in levels]
+            results[user] = counts + [0] * (k - len(counts))  # Hops past the edge of the component are empty
+        return results
+
+    def k_hop_neighbors(self, user, k):
+        """Return [(user, hop), ...] for everyone within k hops of user, sorted by hop (friends of friends for k = 2)."""
+        return self.k_hop_neighbors_many([user], k).get(user, [])
+
+    def k_hop_counts(self, user, k):
+        """Return the number of users at 1, 2, ... k hops from user."""
+        return self.k_hop_counts_many([user], k).get(user, [])
+
+    def _bfs_snapshot(self):
+        """
+        Return the snapshot the vectorized BFS should run on, or None to expand one user at a time.
+
+        The vectorized BFS lives in Analytics, which its callers import lazily:
+        Analytics pulls in multiprocessing and SharedGraph, which would
+        otherwise both load whenever Graph is imported.
+
+        """
+        if np is None:
+            return None
+        if self._snapshot is not None and self._snapshot.version == self.version:
+            return self._snapshot
+        # Taking a snapshot costs more than one Python BFS, so only large graphs pay for it up front
+        return self.snapshot() if self.num_users >= VECTORIZED_BFS_MIN_USERS else None
+
+    def bfs_results(self, start_user):
+        """
+        Return the (user, depth, parent) tuples of a full BFS from start_user, in the order iter_bfs yields them.
+
+        With NumPy, on a large graph or one with a current snapshot, this runs
+        the vectorized direction-optimizing BFS over the snapshot instead of
+        expanding one user at a time.
+
+        """
+        snapshot = self._bfs_snapshot()
+        if snapshot is not None and start_user in self.users:
+            from Analytics import bfs_order  # For the vectorized BFS (see _bfs_snapshot)
+            return bfs_order(snapshot, start_user)
+        return list(self.iter_bfs(start_user))
+
+    def hop_distances(self, user):
+        """Return a dictionary mapping every user reachable from user to their number of hops."""
+        if user not in self.users:
+            print(f"{Fore.RED}User {user} not found.")
+            return {}
+        snapshot = self._bfs_snapshot()
+        if snapshot is None:
+            return {name: depth for name, depth, _ in self.iter_bfs(user)}
+        from Analytics import hop_distances  # For the vectorized BFS (see _bfs_snapshot)
+        distances = hop_distances(snapshot, user).distances
+        reached = np.flatnonzero(distances >= 0)
+        return dict(zip([snapshot.names[vertex] for vertex in reached.tolist()], distances[reached].tolist()))
 
-        for user in self.users:
-            if user not in visited:
-                # If the user has not been visited, perform a DFS/BFS to find all connected users
-                component = self._explore_component(user, visited)
-                components.append(component)  # Add the found component to the list
+    def bfs(self, start_user):
+        """Perform a Breadth-First Search (BFS) starting from the given user."""
+        if start_user not in self.users:
+            # Notify if the starting user is not found
+            print(f"{Fore.RED}User {start_user} not found.")
+            return
         
-        return components
-    
-    def _explore_component(self, start_user, visited):
-        """Explore all users in the connected component starting from start_user."""
-        stack = [start_user]  # Initialize the stack for DFS
-        component = []  # List to hold the current connected component
+        print(Fore.GREEN + "BFS traversal starting from", start_user + ":")
+        for user, _, _ in self.bfs_results(start_user):
+            print(user, end=' ')  # Print each user in the order it is reached
 
-        while stack:
-            user = stack.pop()  # Pop a user from the stack
-            if user not in visited:
-                visited.add(user)  # Mark the user as visited
-                component.append(user)  # Add the user to the current component
-                
-                # Check all possible connections from the current user
-                index = self.users[user]  # Get the index of the user
-                for neighbor_index in range(self.num_users):
-                    if self.graph[index][neighbor_index] < float('inf'):  # Check if there is a valid connection
-                        neighbor = self.get_all_users()[neighbor_index]
-                        if neighbor not in visited:
-                            stack.append(neighbor)  # Add unvisited neighbors to the stack
+    def dfs(self, start_user):
+        """Perform a Depth-First Search (DFS) starting from the given user."""
+        if start_user not in self.users:
+            # Notify if the starting user is not found
+            print(f"{Fore.RED}User {start_user} not found.")
+            return
         
-        return component  # Return the connected component found
+        print(Fore.GREEN + "DFS traversal starting from", start_user + ":")
+        for user, _, _ in self.iter_dfs(start_user):
+            print(user, end=' ')  # Print each user as it is reached
+
+    def _find(self, index):
+        """Return the root of the component containing index, halving the path on the way."""
+        parent = self._parent
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]  # Point to the grandparent to shorten future walks
+            index = parent[index]
+        return index
+
+    def _union(self, idx1, idx2):
+        """Merge the components of two indices, attaching the shallower tree under the deeper one."""
+        root1, root2 = self._find(idx1), self._find(idx2)
+        if root1 == root2:
+            return
+        if self._rank[root1] < self._rank[root2]:
+            root1, root2 = root2, root1
+        self._parent[root2] = root1
+        self._size[root1] += self._size[root2]
+        if self._rank[root1] == self._rank[root2]:
+            self._rank[root1] += 1
+
+    def _rebuild_components(self):
+        """Rebuild the union-find from the current connections."""
+        slots = len(self.names)
+        self._parent = list(range(slots))
+        self._rank = [0] * slots
+        self._size = [1] * slots
+        for index in range(slots):
+            for neighbor_index in self.neighbor_indices(index):
+                if neighbor_index > index:  # Each connection once
+                    self._union(index, neighbor_index)
+        self._components_dirty = False
+
+    def _component_root(self, index):
+        """Return the component root of index, rebuilding first if removals made the union-find stale."""
+        if self._components_dirty:
+            self._rebuild_components()
+        return self._find(index)
+
+    def component_of(self, user):
+        """Return the representative user of the component that contains user."""
+        if user not in self.users:
+            print(f"{Fore.RED}User {user} not found.")
+            return None
+        return self.names[self._component_root(self.users[user])]
+
+    def same_component(self, user1, user2):
+        """Return True if there is a path of friendships between the two users."""
+        if user1 not in self.users or user2 not in self.users:
+            print(f"{Fore.RED}Users {user1} and/or {user2} not found.")
+            return False
+        return self._component_root(self.users[user1]) == self._component_root(self.users[user2])
+
+    def component_sizes(self):
+        """Return a dictionary mapping each component's representative user to its size."""
+        if self._components_dirty:
+            self._rebuild_components()
+        return {name: self._size[index] for index, name in enumerate(self.names)
+                if name is not None and self._parent[index] == index}
+
+    def connected_components(self):
+        """Find and return all connected components in the graph."""
+        components = {}  # Component root -> list of its users
+        for user, index in self.users.items():
+            components.setdefault(self._component_root(index), []).append(user)
+        return list(components.values())
     
     def visualize(self):
         """Visualize the social network graph using NetworkX and Matplotlib with enhanced aesthetics."""
@@ -257,13 +651,11 @@ class AdjacencyMatrix:
         for user in self.users:
             G.add_node(user)
 
-        # Add edges based on the adjacency matrix
-        for i in range(len(self.graph)):
-            for j in range(i + 1, len(self.graph[i])):
-                if self.graph[i][j] == 1:
-                    user1 = self.get_all_users()[i]
-                    user2 = self.get_all_users()[j]
-                    G.add_edge(user1, user2)
+        # Add edges based on the adjacency storage
+        for i, user in enumerate(self.names):
+            for j in self.neighbor_indices(i):
+                if j > i:  # Each connection is stored in both directions, add it once
+                    G.add_edge(user, self.names[j])
 
         # Set node colors based on degree
         node_colors = [G.degree(user) for user in G.nodes()]
@@ -297,8 +689,8 @@ class AdjacencyMatrix:
 
     def average_friends_per_user(self):
         """Calculate the average number of friends per user."""
-        # Count the total number of actual friends by iterating over the adjacency matrix (graph)
-        total_friends = sum(len([j for j in row if j == 1]) for row in self.graph)
+        # Every connection gives a friend to both of its users
+        total_friends = 2 * self.num_connections
         # Return the average number of friends per user, ensuring no division by zero
         return total_friends / self.num_users if self.num_users > 0 else 0
     
@@ -306,30 +698,167 @@ class AdjacencyMatrix:
         """Calculate the density of the network."""
         # Calculate the total possible connections in a complete graph of num_users
         total_possible_connections = self.num_users * (self.num_users - 1) / 2
-        # Count actual connections by summing all connections in the adjacency matrix and dividing by 2
-        actual_connections = sum(sum(row) for row in self.graph) / 2
+        # Actual connections are counted as they are added and removed
+        actual_connections = self.num_connections
         # Return the network density as the ratio of actual connections to possible connections
         return actual_connections / total_possible_connections if total_possible_connections > 0 else 0
     
+    def _triangles_per_index(self):
+        """Count the triangles through every index using degree-ordered forward adjacency."""
+        degrees = self.degree_counts
+        # Rank users by (degree, index) so every triangle is found exactly once, from its lowest-ranked corner
+        order = sorted((index for index, name in enumerate(self.names) if name is not None),
+                       key=lambda index: (degrees[index], index))
+        rank = [0] * len(self.names)
+        for position, index in enumerate(order):
+            rank[index] = position
+
+        # Forward adjacency: keep only neighbours that rank higher, at most sqrt(2m) of them per user
+        forward = [()] * len(self.names)
+        for index in order:
+            forward[index] = {j for j in self.neighbor_indices(index) if rank[j] > rank[index]}
+
+        triangles = [0] * len(self.names)
+        for u in order:
+            forward_u = forward[u]
+            for v in forward_u:
+                # Every shared forward neighbour closes the triangle (u, v, w)
+                for w in forward_u & forward[v]:
+                    triangles[u] += 1
+                    triangles[v] += 1
+                    triangles[w] += 1
+        return triangles
+
+    def _update_triangles(self, idx1, idx2, change):
+        """Add change to the triangle counters for every triangle through the connection idx1 - idx2."""
+        shared = self.graph.common_neighbors(idx1, idx2)
+        for index in shared:
+            self.triangles[index] += change
+        self.triangles[idx1] += change * len(shared)
+        self.triangles[idx2] += change * len(shared)
+        self.num_triangles += change * len(shared)
+
+    def _current_triangles(self):
+        """Return the triangles through every index, from the live counters when they are tracked."""
+        if self.triangles is not None:
+            return self.triangles
+        return self._triangles_per_index()
+
+    def verify_counters(self):
+        """Recount the degrees and connections from the storage and check the live counters against them."""
+        if self.graph.degrees() != self.degree_counts or self.graph.edge_count() != self.num_connections:
+            print(f"{Fore.RED}Degree or connection counters are out of sync with the storage.")
+            return False
+        return True
+
+    def verify_triangles(self):
+        """Recount every triangle from scratch and check the live counters against it."""
+        if self.triangles is None:
+            return True  # Nothing is tracked, so nothing can drift
+        expected = self._triangles_per_index()
+        if expected != self.triangles or sum(expected) != 3 * self.num_triangles:
+            print(f"{Fore.RED}Triangle counters are out of sync with the connections.")
+            return False
+        return True
+
+    def triangle_counts(self):
+        """Return a dictionary mapping every user to the number of triangles they belong to."""
+        triangles = self._current_triangles()
+        return {user: triangles[index] for index, user in enumerate(self.names) if user is not None}
+
+    def local_clustering(self, user):
+        """Return the fraction of pairs of the user's friends that are friends with each other."""
+        if user not in self.users:
+            print(f"{Fore.RED}User {user} not found.")
+            return 0
+        index = self.users[user]
+        degree = self.degree_counts[index]
+        if degree < 2:
+            return 0  # Fewer than two friends cannot form a pair
+        if self.triangles is not None:
+            return 2 * self.triangles[index] / (degree * (degree - 1))
+        # Each connection between two friends is seen from both of its ends
+        links = sum(self.graph.common_neighbor_count(index, j) for j in self.neighbor_indices(index)) // 2
+        return 2 * links / (degree * (degree - 1))
+
+    def average_clustering(self):
+        """Return the local clustering coefficient averaged over all users."""
+        if self.num_users == 0:
+            return 0
+        triangles = self._current_triangles()
+        total = 0
+        for index, degree in enumerate(self.degree_counts):
+            if degree >= 2:  # Users with fewer than two friends contribute 0
+                total += 2 * triangles[index] / (degree * (degree - 1))
+        return total / self.num_users
+
+    def transitivity(self):
+        """Return the global clustering coefficient: 3 x triangles / connected triples."""
+        triads = sum(degree * (degree - 1) // 2 for degree in self.degree_counts)
+        if triads == 0:
+            return 0
+        # Each triangle is counted once at each of its three corners
+        return sum(self._current_triangles()) / triads
+
     def clustering_coefficient(self):
         """Calculate the average clustering coefficient of the network."""
-        G = nx.Graph()  # Create an empty graph using NetworkX
-        
-        # Add all users as nodes to the graph
-        for user in self.users:
-            G.add_node(user)
-        
-        # Iterate over the adjacency matrix to add edges between connected users
-        for i in range(len(self.graph)):
-            for j in range(i + 1, len(self.graph[i])):
-                if self.graph[i][j] == 1:  # Check if there is a connection
-                    user1 = self.get_all_users()[i]  # Get the user corresponding to index i
-                    user2 = self.get_all_users()[j]  # Get the user corresponding to index j
-                    G.add_edge(user1, user2)  # Add an edge between user1 and user2
-        
-        # Return the average clustering coefficient of the graph
-        return nx.average_clustering(G)
-    
+        return self.average_clustering()
+
+    def _core_numbers_per_index(self):
+        """Batagelj-Zaversnik bucket-queue core decomposition in O(n + m); None for removed slots."""
+        count = len(self.names)
+        degree = list(self.degree_counts)
+        max_degree = max(degree, default=0)
+        # Bin sort the indices by degree: position[v] is v's place in order, start[d] the first place of degree d
+        bin_sizes = [0] * (max_degree + 1)
+        for d in degree:
+            bin_sizes[d] += 1
+        start = [0] * (max_degree + 1)
+        for d in range(1, max_degree + 1):
+            start[d] = start[d - 1] + bin_sizes[d - 1]
+        order = [0] * count
+        position = [0] * count
+        next_place = list(start)
+        for index, d in enumerate(degree):
+            position[index] = next_place[d]
+            order[next_place[d]] = index
+            next_place[d] += 1
+
+        # Peel the indices in order of current degree; a neighbour with a higher degree
+        # drops one bin by swapping it to the front of its bin
+        for place in range(count):
+            index = order[place]
+            for neighbor_index in self.graph.neighbors(index):
+                neighbor_degree = degree[neighbor_index]
+                if neighbor_degree > degree[index]:
+                    first = order[start[neighbor_degree]]
+                    if first != neighbor_index:
+                        first_place, neighbor_place = start[neighbor_degree], position[neighbor_index]
+                        order[first_place], order[neighbor_place] = neighbor_index, first
+                        position[neighbor_index], position[first] = first_place, neighbor_place
+                    start[neighbor_degree] += 1
+                    degree[neighbor_index] -= 1
+        return [core if name is not None else None for core, name in zip(degree, self.names)]
+
+    def core_numbers(self):
+        """Return a dictionary mapping each user to their core number (largest k of a k-core containing them)."""
+        cores = self._core_numbers_per_index()
+        return {name: cores[index] for index, name in enumerate(self.names) if name is not None}
+
+    def k_core(self, k):
+        """Return a new AdjacencyMatrix with the users (and their connections) of the k-core."""
+        cores = self._core_numbers_per_index()
+        core = AdjacencyMatrix(backend=self.backend, compact_threshold=self.compact_threshold,
+                               track_triangles=self.triangles is not None)
+        members = [index for index, name in enumerate(self.names) if name is not None and cores[index] >= k]
+        for index in members:
+            core.adduser(self.names[index])
+        for index in members:
+            for neighbor_index in self.neighbor_indices(index):
+                if neighbor_index > index and cores[neighbor_index] >= k:
+                    core.addconnection(self.names[index], self.names[neighbor_index])
+        return core
+
     def clear_screen():
         """Clear the terminal screen for a better user interface."""
         os.system('cls' if os.name == 'nt' else 'clear')  # Clear the screen based on the operating system
@@ -368,7 +897,6 @@ def main():
     graph.addconnection("Abbass", "Layla")
     graph.addconnection("Yara", "Mohamad")
     graph.addconnection("Omar", "Mohamad")
-    graph.addconnection("Mohamad", "Mohamad")
 
     graph.displayGraph()
     print()
@@ -118,7 +118,7 @@ class GraphApp(tk.Tk):
 
             # Check if the users exist and if the connection has been effectively removed
             if user1 in self.graph.users and user2 in self.graph.users:
-                if self.graph.graph[self.graph.users[user1]][self.graph.users[user2]] == 0:
+                if not self.graph.has_connection(user1, user2):
                     messagebox.showinfo("Success", f"Connection between '{user1}' and '{user2}' removed!", parent=self)
                 else:
                     messagebox.showwarning("Warning", f"Connection could not be removed. Check user names.", parent=self)
@@ -133,6 +133,8 @@ class GraphApp(tk.Tk):
         density = self.graph.network_density()
         clustering = self.graph.clustering_coefficient()
         stats_message = (
+            f"Users: {self.graph.num_users}\n"
+            f"Connections: {self.graph.num_connections}\n"
             f"Average number of friends per user: {avg_friends:.2f}\n"
             f"Network density: {density:.2f}\n"
             f"Clustering coefficient: {clustering:.2f}"
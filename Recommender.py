@@ -0,0 +1,162 @@
+import heapq  # For keeping only the top-k candidates (bounded heap)
+import math  # For the logarithm in the Adamic-Adar score
+import os  # For the default number of worker processes
+from multiprocessing import Pool  # For scoring many users in parallel worker processes
+from colorama import Fore  # For format text output in the console with colors.
+from SharedGraph import SharedGraph, attach_worker, worker_snapshot  # For handing the graph to worker processes without copying it
+from User import User  # For the pending friend requests
+
+
+# Link-prediction scores understood by FriendRecommender
+METRICS = ("common_neighbors", "jaccard", "adamic_adar", "resource_allocation")
+
+
+def score_candidates(adjacency, degrees, source, metric, excluded=()):
+    """
+    Score every user two hops from source that is not already a friend.
+
+    adjacency[i] lists the neighbours of index i and degrees[i] is their
+    number. Indices in excluded are never suggested. Returns a dictionary
+    mapping candidate index -> score under the given metric.
+
+    """
+    friends = set(adjacency[source])
+    scores = {}
+    for friend in friends:
+        degree = degrees[friend]
+        if degree < 2:
+            continue  # The friend knows nobody but source, so introduces no one
+        # The weight a shared friend contributes depends on the metric
+        if metric == "adamic_adar":
+            weight = 1 / math.log(degree)
+        elif metric == "resource_allocation":
+            weight = 1 / degree
+        else:
+            weight = 1  # common_neighbors, and the shared-friend count used by jaccard
+        for candidate in adjacency[friend]:
+            if candidate == source or candidate in friends or candidate in excluded:
+                continue
+            scores[candidate] = scores.get(candidate, 0) + weight
+    if metric == "jaccard":
+        # |shared| / |union| where |union| = deg(source) + deg(candidate) - |shared|
+        for candidate, shared in scores.items():
+            scores[candidate] = shared / (len(friends) + degrees[candidate] - shared)
+    return scores
+
+
+def top_k(scores, k):
+    """Return the k best (index, score) pairs, best first."""
+    return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+def _recommend_chunk(adjacency, degrees, excluded, metric, k, sources):
+    """Return [(source, top-k pairs), ...] for a list of source indices."""
+    return [(source, top_k(score_candidates(adjacency, degrees, source, metric, excluded.get(source, ())), k))
+            for source in sources]
+
+
+class _StorageRows:
+    """Read-only adjacency view that fetches rows from an AdjacencyMatrix on demand."""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, index):
+        return self.graph.neighbor_indices(index)
+
+
+# Scoring inputs held by each worker process, set once by _init_worker
+_worker_state = None
+
+
+def _init_worker(name, excluded, metric, k):
+    """Attach to the published graph and keep the scoring settings, once per worker."""
+    global _worker_state
+    attach_worker(name)
+    snapshot = worker_snapshot()
+    _worker_state = (snapshot.rows(), snapshot.degree_view(), excluded, metric, k)
+
+
+def _score_chunk(sources):
+    """Score a chunk of source indices inside a worker process."""
+    return _recommend_chunk(*_worker_state, sources)
+
+
+class FriendRecommender:
+    """
+    "People you may know" suggestions over an AdjacencyMatrix.
+
+    Non-friends two hops away are scored by common neighbours, Jaccard,
+    Adamic-Adar or resource allocation, and the top k are kept with a
+    bounded heap. Users with a pending friend request in either direction
+    (User.friend_requests) are never suggested to each other.
+
+    """
+
+    def __init__(self, graph, people=None):
+        """
+        Parameters:
+        graph (AdjacencyMatrix): The friendship graph to recommend from.
+        people (list of User): Profiles whose pending requests are excluded (defaults to User.all_users).
+
+        """
+        self.graph = graph
+        self.people = User.all_users if people is None else people
+
+    def _pending_requests(self):
+        """Return a dictionary mapping an index to the indices it has pending requests with."""
+        users = self.graph.users
+        pending = {}
+        for person in self.people:
+            for requested in person.friend_requests:
+                if person.name in users and requested.name in users:
+                    sender, receiver = users[person.name], users[requested.name]
+                    pending.setdefault(sender, set()).add(receiver)
+                    pending.setdefault(receiver, set()).add(sender)
+        return pending
+
+    def recommend(self, user, k=10, metric="adamic_adar"):
+        """Return up to k [(user, score), ...] suggestions for user, best first."""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. Choose from: {', '.join(METRICS)}.")
+        if user not in self.graph.users:
+            print(f"{Fore.RED}User {user} not found.")
+            return []
+        source = self.graph.users[user]
+        excluded = self._pending_requests().get(source, ())
+        scores = score_candidates(_StorageRows(self.graph), self.graph.degree_counts, source, metric, excluded)
+        return [(self.graph.names[index], score) for index, score in top_k(scores, k)]
+
+    def recommend_all(self, k=10, metric="adamic_adar", processes=None, chunk_size=256):
+        """
+        Return a dictionary mapping every user to their top-k suggestions.
+
+        The users are split into chunks scored by a pool of processes worker
+        processes (os.cpu_count() by default; 1, or a graph that fits in a
+        single chunk, scores in this process). The workers read the graph
+        from a SharedGraph instead of a pickled copy.
+
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. Choose from: {', '.join(METRICS)}.")
+        graph = self.graph
+        # Scoring runs on the snapshot's vertices, which number the live users in index order
+        snapshot = graph.snapshot()
+        vertex_of = {graph.users[name]: vertex for vertex, name in enumerate(snapshot.names)}
+        excluded = {vertex_of[index]: {vertex_of[other] for other in others}
+                    for index, others in self._pending_requests().items()}
+        sources = list(range(len(snapshot)))
+        chunks = [sources[i:i + chunk_size] for i in range(0, len(sources), chunk_size)]
+
+        processes = processes or os.cpu_count() or 1
+        if processes == 1 or len(chunks) <= 1:
+            adjacency = snapshot.adjacency()
+            degrees = [len(neighbors) for neighbors in adjacency]
+            results = _recommend_chunk(adjacency, degrees, excluded, metric, k, sources)
+        else:
+            with SharedGraph.publish(snapshot) as shared, \
+                    Pool(processes, initializer=_init_worker, initargs=(shared.name, excluded, metric, k)) as pool:
+                results = [pair for chunk in pool.imap_unordered(_score_chunk, chunks) for pair in chunk]
+
+        names = snapshot.names
+        return {names[source]: [(names[vertex], score) for vertex, score in best] for source, best in results}
@@ -0,0 +1,163 @@
+import sys  # For choosing how to attach without the resource tracker
+import threading  # For serializing the resource tracker workaround
+from multiprocessing import resource_tracker, shared_memory  # For the block of memory shared with workers
+from Snapshot import GraphSnapshot  # For the array-encoded graph that is published
+
+
+# Int64 words before the CSR arrays in a published block: vertex count, length of indices, graph version
+_HEADER = 3
+
+# Blocks published by this process, keyed by the snapshot they hold, so repeated publishes share one block
+_published = {}
+
+# Held while resource_tracker.register is swapped out, and while blocks are created, so no
+# block created by SharedGraph in another thread misses its registration
+_tracker_lock = threading.Lock()
+
+# Graph attached by attach_worker in a worker process
+_worker_graph = None
+
+
+def _open(name):
+    """
+    Open an existing block without letting the resource tracker of this process claim it.
+
+    Before Python 3.13 this swaps out resource_tracker.register for the whole
+    process while the block is opened. The swap is serialized with the other
+    SharedGraph calls, but code that creates a SharedMemory block from another
+    thread at the same moment would skip its registration too.
+
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before Python 3.13 every attach registers the block with the resource tracker,
+    # which unlinks it when the attaching process exits. Unregistering afterwards is
+    # no good either: pool workers share the publisher's tracker, so it would drop
+    # the publisher's own registration. Skip the registration instead.
+    with _tracker_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def attach_worker(name):
+    """Pool initializer: attach this worker process to a published graph once, instead of receiving a copy."""
+    global _worker_graph
+    _worker_graph = SharedGraph.attach(name)
+
+
+def worker_snapshot():
+    """Return the GraphSnapshot attached by attach_worker in this worker process."""
+    return _worker_graph.snapshot
+
+
+def worker_rows():
+    """Return the neighbour rows of the graph attached by attach_worker, as zero-copy slices."""
+    return _worker_graph.snapshot.rows()
+
+
+class SharedGraph:
+    """
+    Read-only GraphSnapshot published in a multiprocessing.shared_memory block.
+
+    The block holds a small header followed by the int64 offsets and indices
+    of the snapshot. Worker processes attach to it by name and read the arrays
+    in place, so starting a worker costs the same whatever the size of the
+    graph. Names stay in the publishing process: workers only see vertices.
+
+    The publisher's handle is reference counted; the block is unlinked when
+    the last reference is released (leaving a with block releases one).
+
+    """
+
+    def __init__(self, memory, snapshot, owner):
+        self.memory = memory  # The SharedMemory block
+        self.snapshot = snapshot  # GraphSnapshot over the block (the published one, for the owner)
+        self.owner = owner  # True in the process that created the block and unlinks it
+        self.references = 1  # Handles still in use; the block is closed when this reaches 0
+        self._views = []  # Memoryviews into the block, released before it is closed
+
+    @classmethod
+    def publish(cls, graph):
+        """
+        Copy the snapshot of graph into a new shared memory block, or reuse the live one.
+
+        Parameters:
+        graph (AdjacencyMatrix or GraphSnapshot): The friendship graph.
+
+        Returns the SharedGraph handle; release it (or use it in a with block) when done.
+
+        """
+        snapshot = GraphSnapshot.of(graph)
+        shared = _published.get(id(snapshot))
+        if shared is not None and shared.snapshot is snapshot:
+            return shared.acquire()
+        count, size = len(snapshot), len(snapshot.indices)
+        with _tracker_lock:
+            memory = shared_memory.SharedMemory(create=True, size=8 * (_HEADER + count + 1 + size))
+        words = memory.buf.cast('q')
+        words[0], words[1], words[2] = count, size, -1 if snapshot.version is None else snapshot.version
+        words[_HEADER:_HEADER + count + 1] = memoryview(snapshot.offsets)
+        words[_HEADER + count + 1:_HEADER + count + 1 + size] = memoryview(snapshot.indices)
+        words.release()
+        shared = cls(memory, snapshot, owner=True)
+        _published[id(snapshot)] = shared
+        return shared
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Attach to a block published by another process.
+
+        Parameters:
+        name (str): The block's name (SharedGraph.name in the publisher).
+
+        Returns a SharedGraph whose snapshot reads the block in place (names is None).
+
+        """
+        memory = _open(name)
+        words = memory.buf.cast('q')
+        count, size, version = words[0], words[1], words[2]
+        offsets = words[_HEADER:_HEADER + count + 1]
+        indices = words[_HEADER + count + 1:_HEADER + count + 1 + size]
+        shared = cls(memory, GraphSnapshot(None, offsets, indices, None if version < 0 else version), owner=False)
+        shared._views = [offsets, indices, words]
+        return shared
+
+    @property
+    def name(self):
+        """Name workers attach to the block by."""
+        return self.memory.name
+
+    def acquire(self):
+        """Take another reference to the block and return self."""
+        self.references += 1
+        return self
+
+    def release(self):
+        """Drop a reference; the last one closes the block (and unlinks it in the publisher)."""
+        self.references -= 1
+        if self.references > 0:
+            return
+        if _published.get(id(self.snapshot)) is self:
+            del _published[id(self.snapshot)]
+        if not self.owner:
+            self.snapshot = None  # Drop the snapshot so only the views below still export the buffer
+        try:
+            for view in self._views:
+                view.release()
+            self._views = []
+            self.memory.close()
+        except BufferError:
+            pass  # NumPy arrays still view the block; the mapping goes when they are garbage collected
+        if self.owner:
+            self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
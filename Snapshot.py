@@ -0,0 +1,120 @@
+from array import array  # For compact, typed integer arrays
+
+try:
+    import numpy as np  # Optional: only needed for the vectorized views of the arrays.
+except ImportError:
+    np = None
+
+
+class _Rows:
+    """Zero-copy sequence of the neighbour rows of CSR buffers (each row is a slice of indices)."""
+
+    def __init__(self, offsets, indices):
+        self.offsets = offsets
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, vertex):
+        return self.indices[self.offsets[vertex]:self.offsets[vertex + 1]]
+
+
+class _Degrees:
+    """Zero-copy sequence of the row lengths of CSR buffers."""
+
+    def __init__(self, offsets):
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, vertex):
+        return self.offsets[vertex + 1] - self.offsets[vertex]
+
+
+class GraphSnapshot:
+    """
+    Read-only, array-encoded copy of an AdjacencyMatrix in compressed-sparse-row form.
+
+    Only current users are kept, renumbered to vertices 0 .. n - 1 in index
+    order. The neighbours of vertex v are indices[offsets[v]:offsets[v + 1]]
+    in ascending order. offsets and indices are flat int64 buffers (arrays,
+    or memoryviews into shared memory, see SharedGraph), so the analytics
+    can view them as NumPy arrays without copying.
+
+    """
+
+    def __init__(self, names, offsets, indices, version=None):
+        self.names = names  # User name of each vertex (None for a snapshot attached from shared memory)
+        self.offsets = offsets  # Row start positions into indices (length = vertices + 1)
+        self.indices = indices  # Concatenated, sorted neighbour rows (each friendship appears twice)
+        self.version = version  # Graph version the snapshot was taken from
+        self._position = None  # Lazily built user name -> vertex lookup
+        self._adjacency = None  # Lazily built list-of-lists copy for pure-Python loops
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Take a snapshot of an AdjacencyMatrix."""
+        live = [index for index, name in enumerate(graph.names) if name is not None]
+        vertex_of = {index: vertex for vertex, index in enumerate(live)}
+        offsets = array('q', [0])
+        indices = array('q')
+        for index in live:
+            # Renumbering keeps index order, so rows stay sorted
+            indices.extend(vertex_of[j] for j in graph.neighbor_indices(index))
+            offsets.append(len(indices))
+        return cls([graph.names[index] for index in live], offsets, indices, graph.version)
+
+    @classmethod
+    def of(cls, graph):
+        """Return graph itself if it is already a snapshot, else the graph's (cached) snapshot."""
+        return graph if isinstance(graph, cls) else graph.snapshot()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def num_edges(self):
+        """Number of (undirected) friendships."""
+        return len(self.indices) // 2
+
+    @property
+    def position(self):
+        """Dictionary mapping each user name to its vertex."""
+        if self._position is None:
+            self._position = {name: vertex for vertex, name in enumerate(self.names)}
+        return self._position
+
+    def neighbors(self, vertex):
+        """Return the neighbour vertices of vertex."""
+        return self.indices[self.offsets[vertex]:self.offsets[vertex + 1]]
+
+    def degree(self, vertex):
+        """Return the number of neighbours of vertex."""
+        return self.offsets[vertex + 1] - self.offsets[vertex]
+
+    def adjacency(self):
+        """Return the neighbour lists of every vertex as plain Python lists (built once)."""
+        if self._adjacency is None:
+            offsets, indices = self.offsets, self.indices
+            self._adjacency = [list(indices[offsets[v]:offsets[v + 1]]) for v in range(len(self))]
+        return self._adjacency
+
+    def rows(self):
+        """Return the neighbour rows as a read-only sequence of zero-copy slices."""
+        return _Rows(self.offsets, self.indices)
+
+    def degree_view(self):
+        """Return the degree of every vertex as a read-only sequence computed from offsets."""
+        return _Degrees(self.offsets)
+
+    def arrays(self):
+        """Return (offsets, indices) as zero-copy NumPy int64 arrays."""
+        if np is None:
+            raise ImportError("Vectorized graph analytics require NumPy (pip install numpy).")
+        offsets = np.frombuffer(self.offsets, dtype=np.int64)
+        indices = np.frombuffer(self.indices, dtype=np.int64)
+        offsets.flags.writeable = False  # The snapshot is read-only
+        indices.flags.writeable = False
+        return offsets, indices
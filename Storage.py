@@ -0,0 +1,413 @@
+from array import array  # For compact, typed integer arrays (used by the CSR backend).
+from bisect import bisect_left  # For binary searching inside a sorted neighbour row.
+
+try:
+    import numpy as np  # Optional: only the "numpy" backend needs it.
+except ImportError:
+    np = None
+
+
+class Storage:
+    """
+    Base class for the adjacency storage backends used by AdjacencyMatrix.
+
+    A backend stores an undirected, unweighted graph whose nodes are the
+    integer indices 0 .. len(storage) - 1. Every backend must implement the
+    methods below; neighbours are always reported in ascending index order.
+
+    """
+
+    def __len__(self):
+        """Return the number of node slots in the storage."""
+        raise NotImplementedError
+
+    def add_node(self):
+        """Append an isolated node and return its index."""
+        raise NotImplementedError
+
+    def clear_node(self, index):
+        """Remove every edge of a node, leaving its (now empty) slot in place."""
+        for j in list(self.neighbors(index)):
+            self.remove_edge(index, j)
+
+    def renumber(self, keep):
+        """Keep only the nodes listed in keep (ascending), renumbering keep[k] to k."""
+        raise NotImplementedError
+
+    def add_edge(self, i, j):
+        """Connect i and j. Return True if the edge is new, False if it already existed."""
+        raise NotImplementedError
+
+    def remove_edge(self, i, j):
+        """Disconnect i and j. Return True if an edge was removed, False otherwise."""
+        raise NotImplementedError
+
+    def has_edge(self, i, j):
+        """Return True if i and j are connected."""
+        raise NotImplementedError
+
+    def neighbors(self, i):
+        """Return the neighbour indices of i in ascending order."""
+        raise NotImplementedError
+
+    def degree(self, i):
+        """Return the number of neighbours of i."""
+        raise NotImplementedError
+
+    def degrees(self):
+        """Return the degree of every node, indexed by node."""
+        return [self.degree(i) for i in range(len(self))]
+
+    def edge_count(self):
+        """Return the number of (undirected) edges."""
+        return sum(self.degrees()) // 2
+
+    def common_neighbors(self, i, j):
+        """Return the neighbours shared by i and j in ascending order."""
+        return sorted(set(self.neighbors(i)).intersection(self.neighbors(j)))
+
+    def common_neighbor_count(self, i, j):
+        """Return how many neighbours i and j share."""
+        return len(self.common_neighbors(i, j))
+
+
+class DenseStorage(Storage):
+    """
+    The original list-of-lists adjacency matrix.
+
+    Each cell holds 1 for a connection and float('inf') for no connection,
+    so memory grows as O(n^2) and listing a row's neighbours scans the row.
+
+    """
+
+    def __init__(self):
+        self.rows = []  # Adjacency matrix, one list of weights per node
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add_node(self):
+        # Extend the graph by adding a new column for the new node in each existing row
+        for row in self.rows:
+            row.append(float('inf'))  # float('inf') marks "no connection"
+        # Append a new row for the new node with no connections
+        self.rows.append([float('inf')] * (len(self.rows) + 1))
+        return len(self.rows) - 1
+
+    def clear_node(self, index):
+        for j in self.neighbors(index):
+            self.rows[j][index] = float('inf')  # Clear the node's column
+        self.rows[index] = [float('inf')] * len(self.rows)  # Clear the node's row
+
+    def renumber(self, keep):
+        self.rows = [[self.rows[i][j] for j in keep] for i in keep]
+
+    def add_edge(self, i, j):
+        if self.rows[i][j] == 1:
+            return False  # Already connected
+        self.rows[i][j] = 1
+        self.rows[j][i] = 1
+        return True
+
+    def remove_edge(self, i, j):
+        if self.rows[i][j] != 1:
+            return False  # Nothing to remove
+        self.rows[i][j] = float('inf')
+        self.rows[j][i] = float('inf')
+        return True
+
+    def has_edge(self, i, j):
+        return self.rows[i][j] == 1
+
+    def neighbors(self, i):
+        # A dense row has to be scanned to find its connections
+        return [j for j, weight in enumerate(self.rows[i]) if weight == 1]
+
+    def degree(self, i):
+        return self.rows[i].count(1)
+
+
+class CSRStorage(Storage):
+    """
+    Compressed-sparse-row adjacency storage.
+
+    Neighbours of node i live in indices[offsets[i]:offsets[i + 1]], sorted
+    ascending, so memory is O(n + m) instead of O(n^2). Mutations are
+    recorded in small per-row delta sets and folded back into the arrays
+    once they grow past merge_threshold times the number of stored edges.
+
+    """
+
+    def __init__(self, merge_threshold=0.25):
+        self.offsets = array('q', [0])  # Row start positions into indices (length = nodes + 1)
+        self.indices = array('q')  # Concatenated, sorted neighbour rows
+        self._added = {}  # Row -> neighbours added since the last compaction
+        self._removed = {}  # Row -> neighbours removed since the last compaction
+        self._pending = 0  # Number of edge changes waiting in the delta sets
+        self.merge_threshold = merge_threshold  # Pending changes, as a fraction of stored edges, that trigger a merge
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _in_base(self, i, j):
+        """Binary search for j in the compacted row of i."""
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        k = bisect_left(self.indices, j, lo, hi)
+        return k < hi and self.indices[k] == j
+
+    def _link(self, i, j):
+        """Record j as a neighbour of i in the delta sets."""
+        removed = self._removed.get(i)
+        if removed and j in removed:
+            removed.discard(j)  # The edge is still in the base row, just un-remove it
+        else:
+            self._added.setdefault(i, set()).add(j)
+
+    def _unlink(self, i, j):
+        """Record that j is no longer a neighbour of i in the delta sets."""
+        added = self._added.get(i)
+        if added and j in added:
+            added.discard(j)  # The edge only ever lived in the delta, drop it
+        else:
+            self._removed.setdefault(i, set()).add(j)
+
+    def _maybe_compact(self):
+        self._pending += 1
+        if self._pending > max(64, self.merge_threshold * len(self.indices)):
+            self.compact()
+
+    def compact(self):
+        """Fold the pending delta sets back into the offsets/indices arrays."""
+        self._rebuild([self.neighbors(i) for i in range(len(self))])
+
+    def _rebuild(self, rows):
+        """Replace the arrays with the given sorted neighbour rows and clear the deltas."""
+        offsets = array('q', [0])
+        indices = array('q')
+        for row in rows:
+            indices.extend(row)
+            offsets.append(len(indices))
+        self.offsets = offsets
+        self.indices = indices
+        self._added = {}
+        self._removed = {}
+        self._pending = 0
+
+    def add_node(self):
+        self.offsets.append(self.offsets[-1])  # A new, empty row at the end
+        return len(self) - 1
+
+    def renumber(self, keep):
+        position = {old: new for new, old in enumerate(keep)}
+        # keep is ascending, so the renumbered rows stay sorted
+        self._rebuild([[position[j] for j in self.neighbors(i)] for i in keep])
+
+    def add_edge(self, i, j):
+        if self.has_edge(i, j):
+            return False
+        self._link(i, j)
+        self._link(j, i)
+        self._maybe_compact()
+        return True
+
+    def remove_edge(self, i, j):
+        if not self.has_edge(i, j):
+            return False
+        self._unlink(i, j)
+        self._unlink(j, i)
+        self._maybe_compact()
+        return True
+
+    def has_edge(self, i, j):
+        if j in self._added.get(i, ()):
+            return True
+        if j in self._removed.get(i, ()):
+            return False
+        return self._in_base(i, j)
+
+    def neighbors(self, i):
+        row = self.indices[self.offsets[i]:self.offsets[i + 1]]
+        added = self._added.get(i)
+        removed = self._removed.get(i)
+        if not added and not removed:
+            return row  # Fast path: the compacted row is already sorted
+        if removed:
+            row = [j for j in row if j not in removed]
+        if added:
+            row = sorted([*row, *added])
+        return row
+
+    def degree(self, i):
+        base = self.offsets[i + 1] - self.offsets[i]
+        return base + len(self._added.get(i, ())) - len(self._removed.get(i, ()))
+
+
+class BitsetStorage(Storage):
+    """
+    Adjacency storage with one arbitrary-precision integer per node.
+
+    Bit j of rows[i] is set when i and j are connected, so an edge test is
+    a single bit probe and the mutual friends of two users are the set bits
+    of rows[i] & rows[j]. Best suited to dense, tightly-knit communities.
+
+    """
+
+    def __init__(self):
+        self.rows = []  # One integer bitset per node
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add_node(self):
+        self.rows.append(0)  # No connections yet
+        return len(self.rows) - 1
+
+    def clear_node(self, index):
+        for j in self._bits(self.rows[index]):
+            self.rows[j] &= ~(1 << index)  # Clear the node's bit in each neighbour's row
+        self.rows[index] = 0
+
+    def renumber(self, keep):
+        position = {old: new for new, old in enumerate(keep)}
+        rows = []
+        for i in keep:
+            row = 0
+            for j in self._bits(self.rows[i]):
+                row |= 1 << position[j]
+            rows.append(row)
+        self.rows = rows
+
+    def add_edge(self, i, j):
+        if self.rows[i] >> j & 1:
+            return False  # Already connected
+        self.rows[i] |= 1 << j
+        self.rows[j] |= 1 << i
+        return True
+
+    def remove_edge(self, i, j):
+        if not self.rows[i] >> j & 1:
+            return False  # Nothing to remove
+        self.rows[i] &= ~(1 << j)
+        self.rows[j] &= ~(1 << i)
+        return True
+
+    def has_edge(self, i, j):
+        return bool(self.rows[i] >> j & 1)
+
+    @staticmethod
+    def _bits(row):
+        """Return the positions of the set bits of row in ascending order."""
+        positions = []
+        while row:
+            lowest = row & -row  # Isolate the lowest set bit
+            positions.append(lowest.bit_length() - 1)
+            row ^= lowest  # Clear it and continue with the next one
+        return positions
+
+    def neighbors(self, i):
+        return self._bits(self.rows[i])
+
+    def degree(self, i):
+        return self.rows[i].bit_count()
+
+    def common_neighbors(self, i, j):
+        return self._bits(self.rows[i] & self.rows[j])
+
+    def common_neighbor_count(self, i, j):
+        return (self.rows[i] & self.rows[j]).bit_count()  # popcount of the shared bits
+
+
+class NumpyStorage(Storage):
+    """
+    Dense adjacency matrix held in a single contiguous NumPy uint8 buffer.
+
+    The buffer is allocated with spare capacity that doubles whenever it
+    fills up, so add_node is amortized O(1) instead of appending to every
+    row, and degree/edge counts are vectorized reductions over the buffer.
+
+    """
+
+    def __init__(self, capacity=16):
+        if np is None:
+            raise ImportError("The 'numpy' backend requires NumPy (pip install numpy).")
+        self.matrix = np.zeros((capacity, capacity), dtype=np.uint8)  # 1 = connected, 0 = not
+        self.size = 0  # Number of node slots in use; the rest is spare capacity
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self):
+        """Double the capacity of the buffer, copying the used block across."""
+        capacity = max(1, 2 * self.matrix.shape[0])
+        matrix = np.zeros((capacity, capacity), dtype=np.uint8)
+        matrix[:self.size, :self.size] = self.matrix[:self.size, :self.size]
+        self.matrix = matrix
+
+    def add_node(self):
+        if self.size == self.matrix.shape[0]:
+            self._grow()
+        self.size += 1  # Spare rows and columns are always kept zeroed
+        return self.size - 1
+
+    def clear_node(self, index):
+        self.matrix[index, :self.size] = 0  # Clear the node's row
+        self.matrix[:self.size, index] = 0  # Clear the node's column
+
+    def renumber(self, keep):
+        keep = np.asarray(keep, dtype=np.int64)
+        block = self.matrix[np.ix_(keep, keep)]  # Gather the surviving rows and columns
+        self.matrix[:self.size, :self.size] = 0  # Spare capacity must stay zeroed
+        self.size = len(keep)
+        self.matrix[:self.size, :self.size] = block
+
+    def add_edge(self, i, j):
+        if self.matrix[i, j]:
+            return False  # Already connected
+        self.matrix[i, j] = 1
+        self.matrix[j, i] = 1
+        return True
+
+    def remove_edge(self, i, j):
+        if not self.matrix[i, j]:
+            return False  # Nothing to remove
+        self.matrix[i, j] = 0
+        self.matrix[j, i] = 0
+        return True
+
+    def has_edge(self, i, j):
+        return bool(self.matrix[i, j])
+
+    def neighbors(self, i):
+        return np.flatnonzero(self.matrix[i, :self.size]).tolist()
+
+    def degree(self, i):
+        return int(np.count_nonzero(self.matrix[i, :self.size]))
+
+    def degrees(self):
+        return self.matrix[:self.size, :self.size].sum(axis=1, dtype=np.int64).tolist()
+
+    def edge_count(self):
+        return int(np.count_nonzero(self.matrix[:self.size, :self.size])) // 2
+
+    def common_neighbors(self, i, j):
+        shared = self.matrix[i, :self.size] & self.matrix[j, :self.size]
+        return np.flatnonzero(shared).tolist()
+
+    def common_neighbor_count(self, i, j):
+        return int(np.count_nonzero(self.matrix[i, :self.size] & self.matrix[j, :self.size]))
+
+
+# Storage backends selectable by name in AdjacencyMatrix(backend=...)
+BACKENDS = {
+    "dense": DenseStorage,
+    "csr": CSRStorage,
+    "bitset": BitsetStorage,
+    "numpy": NumpyStorage,
+}
+
+
+def create_storage(backend):
+    """Create an empty storage backend from its name."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown storage backend '{backend}'. Choose from: {', '.join(BACKENDS)}.")
+    return BACKENDS[backend]()
@@ -222,4 +222,5 @@ def main():
         print(user)  
 
 
-main()  
\ No newline at end of file
+if __name__ == "__main__":
+    main()